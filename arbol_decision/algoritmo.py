@@ -1,120 +1,286 @@
 from collections import Counter
 import numpy as np
 
-from arbol_decision.entropia import calcular_entropia
+from arbol_decision.entropia import calcular_entropia, calcular_entropia_conteos
 from arbol_decision.nodo import Nodo
+from compartido.perfil import Perfil
+from compartido.valores_faltantes import VALORES_FALTANTES
 
 class C45:
-    def __init__(self, min_samples_split=2, max_depth=100):
+    def __init__(self, min_samples_split=2, max_depth=100, perfilar=False,
+                 valores_faltantes=VALORES_FALTANTES.descartar):
         self.min_samples_split = min_samples_split
         self.max_depth = max_depth
         self.root = None
+        self._tipo_clases = None
+        # Con perfilar=True, fit() mide el tiempo de cada fase y cuenta nodos y candidatos evaluados
+        self.perfilar = perfilar
+        self.perfil = Perfil()
+        # Tratamiento de los valores faltantes (NaN). Con 'descartar' las muestras sin valor no pasan a ninguna
+        # rama; con 'fraccionar' se sigue a C4.5: cada muestra tiene un peso, la ganancia se calcula con las
+        # muestras con valor y se escala por su fracción del peso, y las muestras sin valor pasan a las dos ramas
+        # (al entrenar y al predecir) con una fracción de su peso.
+        self.valores_faltantes = valores_faltantes
+        self._n_classes = 0
 
     def fit(self, X, y):
         """Función principal para entrenar (construir) el árbol."""
-        self.root = self._construir_arbol(X, y)
+        if self.valores_faltantes not in (VALORES_FALTANTES.descartar, VALORES_FALTANTES.fraccionar):
+            raise RuntimeError("Tratamiento de valores faltantes desconocido: " + str(self.valores_faltantes))
+        self.perfil = Perfil(self.perfilar)
+        # Tipo de las etiquetas, para reservar de antemano el arreglo de predicciones
+        self._tipo_clases = np.asarray(y).dtype
+        self._n_classes = len(np.bincount(y))
+        with self.perfil.medir('entrenamiento'):
+            if self.valores_faltantes == VALORES_FALTANTES.fraccionar:
+                self.root = self._construir_arbol_ponderado(X, y, np.ones(len(y)))
+            else:
+                self.root = self._construir_arbol(X, y)
 
     def _construir_arbol(self, X, y, depth=0):
         """Función recursiva para construir el árbol."""
         n_samples, n_features = X.shape
         n_labels = len(np.unique(y))
+        self.perfil.contar('nodos', 1, depth)
 
         # Criterios de parada
         if (depth >= self.max_depth
                 or n_labels == 1
                 or n_samples < self.min_samples_split):
-            leaf_value = self._clase_mas_comun(y)
-            return Nodo(value=leaf_value)
+            if depth >= self.max_depth:
+                motivo = 'profundidad_maxima'
+            elif n_labels == 1:
+                motivo = 'una_sola_clase'
+            else:
+                motivo = 'min_muestras'
+            return self._crear_hoja(y, motivo, depth)
 
         # Encontrar la mejor división usando Tasa de Ganancia
-        best_feat, best_thresh = self._encontrar_mejor_division(X, y)
+        with self.perfil.medir('busqueda_division', depth):
+            best_feat, best_thresh = self._encontrar_mejor_division(X, y)
 
         # Si la ganancia es 0, no podemos dividir más
         if best_feat is None:
-            leaf_value = self._clase_mas_comun(y)
-            return Nodo(value=leaf_value)
+            return self._crear_hoja(y, 'sin_division', depth)
 
         # Dividir los datos y construir sub-árboles
-        left_idxs, right_idxs = self._dividir(X[:, best_feat], best_thresh)
+        with self.perfil.medir('particion', depth):
+            left_idxs, right_idxs = self._dividir(X[:, best_feat], best_thresh)
         left = self._construir_arbol(X[left_idxs, :], y[left_idxs], depth + 1)
         right = self._construir_arbol(X[right_idxs, :], y[right_idxs], depth + 1)
 
-        return Nodo(best_feat, best_thresh, left, right)
+        return Nodo(best_feat, best_thresh, left, right, n_samples=n_samples,
+                    most_common_class=self._clase_mas_comun(y))
+
+    def _crear_hoja(self, y, motivo, depth):
+        """Crea un nodo hoja con la clase más común y registra en el perfil el motivo de parada."""
+        self.perfil.registrar_hoja(motivo, depth)
+        with self.perfil.medir('clase_mas_comun', depth):
+            leaf_value = self._clase_mas_comun(y)
+        return Nodo(value=leaf_value, n_samples=len(y), most_common_class=leaf_value)
+
+    def _construir_arbol_ponderado(self, X, y, w, depth=0):
+        """
+        Versión de _construir_arbol con un peso por muestra (valores_faltantes='fraccionar'). Las muestras
+        sin valor en la característica elegida pasan a las dos ramas, con su peso multiplicado por la
+        fracción del peso con valor que tiene cada rama.
+        """
+        conteos = np.bincount(y, weights=w, minlength=self._n_classes)
+        n_samples = conteos.sum()
+        self.perfil.contar('nodos', 1, depth)
+
+        if (depth >= self.max_depth
+                or np.count_nonzero(conteos) == 1
+                or n_samples < self.min_samples_split):
+            if depth >= self.max_depth:
+                motivo = 'profundidad_maxima'
+            elif np.count_nonzero(conteos) == 1:
+                motivo = 'una_sola_clase'
+            else:
+                motivo = 'min_muestras'
+            return self._crear_hoja_ponderada(conteos, motivo, depth)
+
+        with self.perfil.medir('busqueda_division', depth):
+            best_feat, best_thresh = self._encontrar_mejor_division_ponderada(X, y, w, n_samples)
+        if best_feat is None:
+            return self._crear_hoja_ponderada(conteos, 'sin_division', depth)
+
+        with self.perfil.medir('particion', depth):
+            X_column = X[:, best_feat]
+            left_idxs, right_idxs = self._dividir(X_column, best_thresh)
+            missing_idxs = np.flatnonzero(np.isnan(X_column))
+            w_left, w_right = w[left_idxs].sum(), w[right_idxs].sum()
+            fraccion_izq = w_left / (w_left + w_right)
+            left_idxs, left_w = (np.concatenate((left_idxs, missing_idxs)),
+                                 np.concatenate((w[left_idxs], w[missing_idxs] * fraccion_izq)))
+            right_idxs, right_w = (np.concatenate((right_idxs, missing_idxs)),
+                                   np.concatenate((w[right_idxs], w[missing_idxs] * (1 - fraccion_izq))))
+        left = self._construir_arbol_ponderado(X[left_idxs, :], y[left_idxs], left_w, depth + 1)
+        right = self._construir_arbol_ponderado(X[right_idxs, :], y[right_idxs], right_w, depth + 1)
+
+        return Nodo(best_feat, best_thresh, left, right, n_samples=n_samples,
+                    most_common_class=int(np.argmax(conteos)), class_counts=conteos)
+
+    def _crear_hoja_ponderada(self, conteos, motivo, depth):
+        """Crea un nodo hoja con la clase de mayor peso (ante empates, la menor)."""
+        self.perfil.registrar_hoja(motivo, depth)
+        leaf_value = int(np.argmax(conteos))
+        return Nodo(value=leaf_value, n_samples=conteos.sum(), most_common_class=leaf_value, class_counts=conteos)
 
     def _encontrar_mejor_division(self, X, y):
         """
-        Itera sobre todas las características y umbrales para encontrar la división
-        que maximice la Tasa de Ganancia.
+        Recorre todas las características y, para cada una, evalúa todos sus umbrales a la vez
+        para encontrar la división que maximice la Tasa de Ganancia.
         """
         best_gain_ratio = -1
         split_idx, split_thresh = None, None
         n_features = X.shape[1]
 
         # Entropía del nodo actual (padre)
-        parent_entropy = calcular_entropia(y)
+        with self.perfil.medir('entropia'):
+            parent_entropy = calcular_entropia(y)
+        n_classes = len(np.bincount(y))
 
         for feat_idx in range(n_features):
             X_column = X[:, feat_idx]
-            thresholds = np.unique(X_column)
-
-            for threshold in thresholds:
-                # Calcular la Ganancia de Información
-                gain = self._ganancia_informacion(y, X_column, threshold, parent_entropy)
-
-                # Si la ganancia es 0, la Tasa de Ganancia también lo será
-                if gain == 0:
-                    continue
-
-                # Calcular la Información de División
-                split_info = self._split_info(y, X_column, threshold)
-
-                # Evitar división por cero
-                if split_info == 0:
-                    continue
-
-                # Calcular la Tasa de Ganancia
-                gain_ratio = gain / split_info
-
-                if gain_ratio > best_gain_ratio:
-                    best_gain_ratio = gain_ratio
-                    split_idx = feat_idx
-                    split_thresh = threshold
+            thresholds, gain_ratios = self._evaluar_umbrales(X_column, y, parent_entropy, n_classes)
+            self.perfil.contar('atributos_evaluados')
+            self.perfil.contar('candidatos_evaluados', len(thresholds))
+            self.perfil.contar('filas_recorridas', len(X_column))
+            if len(thresholds) == 0:
+                continue
+
+            # Ante empates se queda con el primer umbral (el menor) y con la primera característica
+            best_idx = np.argmax(gain_ratios)
+            if gain_ratios[best_idx] > best_gain_ratio:
+                best_gain_ratio = gain_ratios[best_idx]
+                split_idx = feat_idx
+                split_thresh = thresholds[best_idx]
 
         return split_idx, split_thresh
 
-    def _ganancia_informacion(self, y, X_column, split_thresh, parent_entropy):
-        """Calcula la Ganancia de Información."""
-        # Dividir los datos
-        left_idxs, right_idxs = self._dividir(X_column, split_thresh)
-        if len(left_idxs) == 0 or len(right_idxs) == 0:
-            return 0
-
-        # Calcular la entropía ponderada de los hijos
+    def _evaluar_umbrales(self, X_column, y, parent_entropy, n_classes):
+        """
+        Calcula la Tasa de Ganancia de todos los umbrales de una característica (sus valores únicos,
+        con la rama izquierda en X <= umbral) con un único ordenamiento y conteos acumulados de clases.
+        Los umbrales con ganancia o información de división nula quedan con Tasa de Ganancia -inf.
+        """
         n = len(y)
-        n_l, n_r = len(left_idxs), len(right_idxs)
-        e_l, e_r = calcular_entropia(y[left_idxs]), calcular_entropia(y[right_idxs])
+        # Los valores faltantes (NaN) quedan al final del ordenamiento y no van a ninguna de las dos ramas
+        orden = np.argsort(X_column, kind='stable')
+        n_valid = np.count_nonzero(X_column == X_column)
+        valores = X_column[orden[:n_valid]]
+        clases = y[orden[:n_valid]]
+        if n_valid == 0:
+            return valores, np.empty(0)
+
+        # Última posición de cada valor en el orden: la rama izquierda de ese umbral termina ahí
+        fin_valor = np.flatnonzero(np.append(valores[1:] != valores[:-1], True))
+        thresholds = valores[fin_valor]
+
+        conteos = np.zeros((n_valid, n_classes), dtype=np.int64)
+        conteos[np.arange(n_valid), clases] = 1
+        conteos_acumulados = np.cumsum(conteos, axis=0)
+        conteos_izq = conteos_acumulados[fin_valor]
+        conteos_der = conteos_acumulados[-1] - conteos_izq
+        n_l = fin_valor + 1
+        n_r = n_valid - n_l
+
+        gain_ratios = np.full(len(thresholds), -np.inf)
+        # Con la rama derecha vacía (el umbral más grande) la ganancia es 0
+        validos = n_r > 0
+        n_l, n_r = n_l[validos], n_r[validos]
+
+        # Ganancia de Información
+        e_l = calcular_entropia_conteos(conteos_izq[validos], n_l)
+        e_r = calcular_entropia_conteos(conteos_der[validos], n_r)
         child_entropy = (n_l / n) * e_l + (n_r / n) * e_r
+        gain = parent_entropy - child_entropy
 
-        # Ganancia de información
-        ig = parent_entropy - child_entropy
-        return ig
+        # Información de División
+        p_l = n_l / n
+        p_r = n_r / n
+        split_info = - (p_l * np.log2(p_l) + p_r * np.log2(p_r))
 
-    def _split_info(self, y, X_column, split_thresh):
-        """Calcula la Información de División."""
-        left_idxs, right_idxs = self._dividir(X_column, split_thresh)
+        # Si la ganancia es 0 la Tasa de Ganancia también lo será, y se evita dividir por cero
+        con_ganancia = (gain != 0) & (split_info != 0)
+        gain_ratios_validos = np.full(len(gain), -np.inf)
+        gain_ratios_validos[con_ganancia] = gain[con_ganancia] / split_info[con_ganancia]
+        gain_ratios[validos] = gain_ratios_validos
+        return thresholds, gain_ratios
 
-        n = len(y)
-        n_l, n_r = len(left_idxs), len(right_idxs)
+    def _encontrar_mejor_division_ponderada(self, X, y, w, peso_total):
+        """Igual que _encontrar_mejor_division, pero con pesos (ver _evaluar_umbrales_ponderados)."""
+        best_gain_ratio = -1
+        split_idx, split_thresh = None, None
 
-        # Si una rama está vacía, el split info es 0
-        if n_l == 0 or n_r == 0:
-            return 0
+        for feat_idx in range(X.shape[1]):
+            X_column = X[:, feat_idx]
+            thresholds, gain_ratios = self._evaluar_umbrales_ponderados(X_column, y, w, peso_total)
+            self.perfil.contar('atributos_evaluados')
+            self.perfil.contar('candidatos_evaluados', len(thresholds))
+            self.perfil.contar('filas_recorridas', len(X_column))
+            if len(thresholds) == 0:
+                continue
+
+            best_idx = np.argmax(gain_ratios)
+            if gain_ratios[best_idx] > best_gain_ratio:
+                best_gain_ratio = gain_ratios[best_idx]
+                split_idx = feat_idx
+                split_thresh = thresholds[best_idx]
 
-        p_l = n_l / n
-        p_r = n_r / n
+        return split_idx, split_thresh
 
-        # Fórmula de Split Info
-        return - (p_l * np.log2(p_l) + p_r * np.log2(p_r))
+    def _evaluar_umbrales_ponderados(self, X_column, y, w, peso_total):
+        """
+        Tasa de Ganancia de C4.5 con valores faltantes para todos los umbrales de una característica, con
+        los mismos conteos acumulados que _evaluar_umbrales pero sumando pesos. La ganancia se calcula solo
+        con las muestras con valor y se multiplica por la fracción del peso que representan; en la
+        información de división las muestras sin valor forman una tercera rama.
+        """
+        orden = np.argsort(X_column, kind='stable')
+        n_valid = np.count_nonzero(X_column == X_column)
+        valores = X_column[orden[:n_valid]]
+        clases = y[orden[:n_valid]]
+        pesos = w[orden[:n_valid]]
+        if n_valid == 0:
+            return valores, np.empty(0)
+
+        fin_valor = np.flatnonzero(np.append(valores[1:] != valores[:-1], True))
+        thresholds = valores[fin_valor]
+
+        conteos = np.zeros((n_valid, self._n_classes))
+        conteos[np.arange(n_valid), clases] = pesos
+        conteos_acumulados = np.cumsum(conteos, axis=0)
+        conteos_conocidos = conteos_acumulados[-1]
+        peso_conocido = conteos_conocidos.sum()
+
+        gain_ratios = np.full(len(thresholds), -np.inf)
+        validos = fin_valor < n_valid - 1
+        conteos_izq = conteos_acumulados[fin_valor[validos]]
+        conteos_der = conteos_conocidos - conteos_izq
+        w_l = conteos_izq.sum(axis=1)
+        w_r = peso_conocido - w_l
+
+        # Ganancia de Información sobre las muestras con valor, escalada por su fracción del peso
+        known_entropy = calcular_entropia_conteos(conteos_conocidos[None, :], np.array([peso_conocido]))[0]
+        e_l = calcular_entropia_conteos(conteos_izq, w_l)
+        e_r = calcular_entropia_conteos(conteos_der, w_r)
+        child_entropy = (w_l / peso_conocido) * e_l + (w_r / peso_conocido) * e_r
+        gain = peso_conocido / peso_total * (known_entropy - child_entropy)
+
+        # Información de División, con las muestras sin valor como una rama más
+        p_l = w_l / peso_total
+        p_r = w_r / peso_total
+        p_u = (peso_total - peso_conocido) / peso_total
+        split_info = - (p_l * np.log2(p_l) + p_r * np.log2(p_r) + (p_u * np.log2(p_u) if p_u > 0 else 0.0))
+
+        # Con pesos las ganancias nulas pueden quedar levemente negativas por redondeo
+        con_ganancia = (gain > 0) & (split_info != 0)
+        gain_ratios_validos = np.full(len(gain), -np.inf)
+        gain_ratios_validos[con_ganancia] = gain[con_ganancia] / split_info[con_ganancia]
+        gain_ratios[validos] = gain_ratios_validos
+        return thresholds, gain_ratios
 
     def _dividir(self, X_column, split_thresh):
         """Devuelve los índices para las ramas izquierda y derecha."""
@@ -129,14 +295,59 @@ class C45:
         return counter.most_common(1)[0][0]
 
     def predict(self, X):
-        """Realiza predicciones para un conjunto de datos X."""
-        return np.array([self._atravesar_arbol(x, self.root) for x in X])
-
-    def _atravesar_arbol(self, x, nodo):
-        """Navega recursivamente el árbol para clasificar una sola muestra 'x'."""
-        if nodo.es_nodo_hoja():
-            return nodo.value
-
-        if x[nodo.feature] <= nodo.threshold:
-            return self._atravesar_arbol(x, nodo.left)
-        return self._atravesar_arbol(x, nodo.right)
\ No newline at end of file
+        """
+        Realiza predicciones para un conjunto de datos X. Las filas bajan por el árbol de a un nivel
+        por vez: cada nodo del nivel recibe el arreglo con sus filas y las reparte entre sus dos hijos
+        con una única comparación X[filas, feature] <= threshold.
+        """
+        X = np.asarray(X)
+        if self.valores_faltantes == VALORES_FALTANTES.fraccionar:
+            return np.argmax(self.predict_proba(X), axis=1).astype(self._tipo_clases)
+        predicciones = np.empty(len(X), dtype=self._tipo_clases)
+        nivel = [(self.root, np.arange(len(X)))]
+        while nivel:
+            siguiente_nivel = []
+            for nodo, filas in nivel:
+                if nodo.es_nodo_hoja():
+                    predicciones[filas] = nodo.value
+                    continue
+                va_izquierda = X[filas, nodo.feature] <= nodo.threshold
+                filas_izq, filas_der = filas[va_izquierda], filas[~va_izquierda]
+                if len(filas_izq) > 0:
+                    siguiente_nivel.append((nodo.left, filas_izq))
+                if len(filas_der) > 0:
+                    siguiente_nivel.append((nodo.right, filas_der))
+            nivel = siguiente_nivel
+        return predicciones
+
+    def predict_proba(self, X):
+        """
+        Distribución de clases de cada fila de X para un árbol entrenado con valores_faltantes='fraccionar'.
+        Las filas bajan de a un nivel como en predict; una fila sin valor en la característica de un nodo
+        sigue por las dos ramas con su peso repartido según el peso de entrenamiento de cada hijo, y suma
+        la distribución de cada hoja a la que llega ponderada por ese peso.
+        """
+        if self.valores_faltantes != VALORES_FALTANTES.fraccionar:
+            raise RuntimeError("predict_proba requiere un árbol entrenado con valores_faltantes='fraccionar'.")
+        X = np.asarray(X)
+        distribucion = np.zeros((len(X), self._n_classes))
+        nivel = [(self.root, np.arange(len(X)), np.ones(len(X)))]
+        while nivel:
+            siguiente_nivel = []
+            for nodo, filas, pesos in nivel:
+                if nodo.es_nodo_hoja():
+                    distribucion[filas] += pesos[:, None] * (nodo.class_counts / nodo.n_samples)
+                    continue
+                valores = X[filas, nodo.feature]
+                faltantes = np.isnan(valores)
+                fraccion_izq = nodo.left.n_samples / (nodo.left.n_samples + nodo.right.n_samples)
+                va_izquierda = (valores <= nodo.threshold) | faltantes
+                va_derecha = (valores > nodo.threshold) | faltantes
+                pesos_izq = np.where(faltantes, pesos * fraccion_izq, pesos)[va_izquierda]
+                pesos_der = np.where(faltantes, pesos * (1 - fraccion_izq), pesos)[va_derecha]
+                if np.any(va_izquierda):
+                    siguiente_nivel.append((nodo.left, filas[va_izquierda], pesos_izq))
+                if np.any(va_derecha):
+                    siguiente_nivel.append((nodo.right, filas[va_derecha], pesos_der))
+            nivel = siguiente_nivel
+        return distribucion
@@ -8,6 +8,21 @@ def calcular_entropia(y):
     ps = hist / len(y)
     return -np.sum([p * np.log2(p) for p in ps if p > 0])
 
+def calcular_entropia_conteos(conteos, totales):
+    """
+    Calcula la entropía de cada fila de una matriz de conteos por clase (una fila por conjunto).
+    Suma los términos en el mismo orden que calcular_entropia, por lo que (con menos de 8 clases) da
+    exactamente el mismo resultado.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ps = conteos / totales[:, None]
+        terminos = np.where(ps > 0, ps * np.log2(ps), 0.0)
+    # Con menos de 8 términos np.sum los acumula en orden (sumar los términos nulos no cambia el resultado)
+    suma = terminos[:, 0].copy()
+    for clase in range(1, conteos.shape[1]):
+        suma += terminos[:, clase]
+    return -suma
+
 def calcular_entropia2(s):
     """Calcula la entropía de una Serie de Pandas."""
     # value_counts() es perfecto para contar las clases
@@ -1,11 +1,20 @@
 class Nodo:
-    def __init__(self, feature=None, threshold=None, left=None, right=None, *, value=None):
-        """Constructor para un nodo. Si 'value' no es None, es un nodo hoja."""
+    def __init__(self, feature=None, threshold=None, left=None, right=None, *, value=None, n_samples=None,
+                 most_common_class=None, class_counts=None):
+        """
+        Constructor para un nodo. Si 'value' no es None, es un nodo hoja.
+        - n_samples: La cantidad de muestras de entrenamiento que llegan al nodo (con pesos, la suma de sus pesos).
+        - most_common_class: La clase más común en este nodo (la predicción si el nodo se convierte en hoja).
+        - class_counts: El peso de las muestras de cada clase en el nodo (solo si se entrena con pesos).
+        """
         self.feature = feature
         self.threshold = threshold
         self.left = left
         self.right = right
         self.value = value
+        self.n_samples = n_samples
+        self.most_common_class = most_common_class
+        self.class_counts = class_counts
 
     def es_nodo_hoja(self):
         return self.value is not None
@@ -0,0 +1,154 @@
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+DIRECTORIO_DATASETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets')
+DATASETS = {
+    'balanceado': 'data_cardiovascular_risk_LIMPIO_BALANCEADO.csv',
+    'desbalanceado': 'data_cardiovascular_risk_LIMPIO_DESBALANCEADO.csv',
+    'sin_tratar': 'data_cardiovascular_risk_SIN_TRATAR.csv',
+}
+NOMBRE_OBJETIVO = 'TenYearCHD'
+# Columnas que no son atributos (identificadores)
+COLUMNAS_IGNORADAS = ['id']
+# Las columnas numéricas con más valores distintos que este límite se consideran continuas al escalar
+MIN_VALORES_CONTINUO = 10
+
+
+class ALGORITMOS:
+    # C4.5 binario sobre matrices de NumPy (arbol_decision/algoritmo.py)
+    c45 = 'c45'
+    # C4.5 multirama sobre DataFrames (arbol_decision/algoritmo2.py)
+    c45_multirama = 'c45_multirama'
+    # mi_arbol_decision/algoritmo3.py
+    arbol_decision = 'arbol_decision'
+
+
+# Carga uno de los datasets incluidos y lo escala a 'escala' veces su cantidad de filas. Las copias agregadas
+# tienen un pequeño ruido gaussiano en los atributos continuos, de modo que la cantidad de valores distintos
+# (y por lo tanto de umbrales candidatos) crece con el tamaño, como en datos reales. El resultado es determinista.
+def cargar_dataset(nombre_dataset: str, escala: int = 1, semilla: int = 0) -> DataFrame:
+    df = pd.read_csv(os.path.join(DIRECTORIO_DATASETS, DATASETS[nombre_dataset]))
+    df = df.drop(columns=[columna for columna in COLUMNAS_IGNORADAS if columna in df.columns])
+    if escala <= 1:
+        return df
+
+    generador = np.random.default_rng(semilla)
+    copias = [df]
+    continuas = [columna for columna in df.columns
+                 if columna != NOMBRE_OBJETIVO and pd.api.types.is_float_dtype(df[columna])
+                 and df[columna].nunique() > MIN_VALORES_CONTINUO]
+    for _ in range(escala - 1):
+        copia = df.copy()
+        for columna in continuas:
+            desvio = np.nanstd(df[columna].to_numpy()) * 0.01
+            copia[columna] = copia[columna] + generador.normal(0, desvio, len(copia))
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+# Convierte un DataFrame en la matriz de NumPy y el vector de clases que espera arbol_decision.algoritmo.C45:
+# los atributos no numéricos se reemplazan por el código de su valor y las clases por enteros desde 0.
+def matriz_c45(df: DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    atributos = df.drop(columns=NOMBRE_OBJETIVO)
+    columnas = []
+    for nombre_atributo in atributos.columns:
+        serie = atributos[nombre_atributo]
+        if pd.api.types.is_numeric_dtype(serie):
+            columnas.append(serie.to_numpy(dtype=np.float64))
+        else:
+            codigos, _ = pd.factorize(serie, sort=True)
+            columnas.append(np.where(codigos >= 0, codigos, np.nan))
+    clases, _ = pd.factorize(df[NOMBRE_OBJETIVO], sort=True)
+    return np.column_stack(columnas), clases.astype(np.int64)
+
+
+# Cuenta los nodos de un árbol de arbol_decision (Nodo binario o NodoMulti) o de mi_arbol_decision (Nodo)
+def contar_nodos(raiz) -> int:
+    cant_nodos = 0
+    nodos_pendientes = [raiz]
+    while nodos_pendientes:
+        nodo = nodos_pendientes.pop()
+        cant_nodos += 1
+        if hasattr(nodo, 'nodos_hijos'):
+            nodos_pendientes.extend(nodo.nodos_hijos.values())
+        elif hasattr(nodo, 'children'):
+            nodos_pendientes.extend(nodo.children.values())
+        elif not nodo.es_nodo_hoja():
+            nodos_pendientes.extend([nodo.left, nodo.right])
+    return cant_nodos
+
+
+# Profundidad máxima de un árbol (la raíz tiene profundidad 0)
+def calcular_profundidad(raiz) -> int:
+    profundidad_maxima = 0
+    nodos_pendientes = [(raiz, 0)]
+    while nodos_pendientes:
+        nodo, profundidad = nodos_pendientes.pop()
+        profundidad_maxima = max(profundidad_maxima, profundidad)
+        if hasattr(nodo, 'nodos_hijos'):
+            hijos = nodo.nodos_hijos.values()
+        elif hasattr(nodo, 'children'):
+            hijos = nodo.children.values()
+        else:
+            hijos = [] if nodo.es_nodo_hoja() else [nodo.left, nodo.right]
+        nodos_pendientes.extend((hijo, profundidad + 1) for hijo in hijos)
+    return profundidad_maxima
+
+
+# Memoria residente máxima del proceso actual, en MB
+def rss_pico_mb() -> float:
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS informa bytes
+    return rss_pico / 1024 ** 2 if sys.platform == 'darwin' else rss_pico / 1024
+
+
+# Datos del entorno que se guardan con cada resultado, para poder comparar versiones
+def describir_entorno() -> dict:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(DIRECTORIO_DATASETS), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': revision,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+    }
+
+
+# Ejecuta un caso de benchmark en un proceso nuevo ('python -m <modulo> --caso <json>'), de modo que el pico de
+# memoria y el estado de cada ejecución no dependan de las anteriores. El proceso hijo debe imprimir el
+# resultado como una línea JSON al final de su salida estándar.
+def ejecutar_en_subproceso(modulo: str, caso: dict, tiempo_limite: float | None) -> dict:
+    comando = [sys.executable, '-m', modulo, '--caso', json.dumps(caso)]
+    try:
+        proceso = subprocess.run(comando, capture_output=True, text=True, timeout=tiempo_limite,
+                                 cwd=os.path.dirname(DIRECTORIO_DATASETS))
+    except subprocess.TimeoutExpired:
+        return {**caso, 'estado': 'tiempo_agotado', 'tiempo_limite_s': tiempo_limite}
+
+    lineas = proceso.stdout.strip().splitlines()
+    if proceso.returncode != 0 or not lineas:
+        error = proceso.stderr.strip().splitlines()
+        return {**caso, 'estado': 'error', 'error': error[-1] if error else 'código ' + str(proceso.returncode)}
+    return {**caso, 'estado': 'ok', **json.loads(lineas[-1])}
+
+
+def guardar_resultado(ruta_salida: str, resultado: dict) -> None:
+    directorio = os.path.dirname(ruta_salida)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta_salida, 'a', encoding='utf-8') as archivo:
+        archivo.write(json.dumps(resultado, ensure_ascii=False) + '\n')
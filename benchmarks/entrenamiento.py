@@ -0,0 +1,111 @@
+# Benchmark de entrenamiento.
+#
+# Entrena cada algoritmo sobre los datasets de 'datasets/' y sobre copias escaladas (10x, 100x, 1000x filas)
+# y agrega una línea JSON por ejecución al archivo de resultados, con el tiempo de entrenamiento, el pico de
+# memoria residente, la cantidad de nodos y los nodos construidos por segundo. Cada ejecución corre en un
+# proceso aparte. Uso (desde la raíz del repositorio):
+#
+#   python -m benchmarks.entrenamiento --salida resultados/entrenamiento.jsonl
+#   python -m benchmarks.entrenamiento --algoritmos arbol_decision --escalas 1 10 --tiempo-limite 120
+import argparse
+import json
+import time
+
+from benchmarks.comun import (ALGORITMOS, DATASETS, NOMBRE_OBJETIVO, cargar_dataset, contar_nodos,
+                              describir_entorno, ejecutar_en_subproceso, guardar_resultado, matriz_c45,
+                              rss_pico_mb)
+from mi_arbol_decision.funcion_impureza.funcion import FUNCIONES_IMPUREZA
+
+ESCALAS = [1, 10, 100, 1000]
+FUNCIONES = [FUNCIONES_IMPUREZA.ganancia_informacion, FUNCIONES_IMPUREZA.tasa_ganancia_informacion]
+
+
+# Genera los casos a ejecutar. Los C4.5 de arbol_decision tienen un único criterio (tasa de ganancia el binario
+# y ganancia de información el multirama), por lo que se ejecutan una sola vez por dataset y escala.
+def generar_casos(algoritmos: list[str], datasets: list[str], escalas: list[int]) -> list[dict]:
+    casos = []
+    for escala in escalas:
+        for nombre_dataset in datasets:
+            for algoritmo in algoritmos:
+                funciones = FUNCIONES if algoritmo == ALGORITMOS.arbol_decision else [None]
+                for funcion_impureza in funciones:
+                    casos.append({'algoritmo': algoritmo, 'funcion_impureza': funcion_impureza,
+                                  'dataset': nombre_dataset, 'escala': escala})
+    return casos
+
+
+# Ejecuta un caso en el proceso actual y devuelve sus mediciones
+def ejecutar_caso(caso: dict) -> dict:
+    df = cargar_dataset(caso['dataset'], caso['escala'])
+    rss_datos = rss_pico_mb()
+
+    if caso['algoritmo'] == ALGORITMOS.arbol_decision:
+        from mi_arbol_decision.algoritmo3 import ArbolDecision
+        arbol = ArbolDecision(funcion_impureza=caso['funcion_impureza'])
+        inicio = time.perf_counter()
+        arbol.entrenar(df, NOMBRE_OBJETIVO)
+        tiempo = time.perf_counter() - inicio
+        cant_nodos = arbol.arbol_compilado.cant_nodos
+    elif caso['algoritmo'] == ALGORITMOS.c45:
+        from arbol_decision.algoritmo import C45
+        X, y = matriz_c45(df)
+        arbol = C45()
+        inicio = time.perf_counter()
+        arbol.fit(X, y)
+        tiempo = time.perf_counter() - inicio
+        cant_nodos = contar_nodos(arbol.root)
+    elif caso['algoritmo'] == ALGORITMOS.c45_multirama:
+        from arbol_decision.algoritmo2 import C45
+        arbol = C45()
+        inicio = time.perf_counter()
+        arbol.fit(df.drop(columns=NOMBRE_OBJETIVO), df[NOMBRE_OBJETIVO])
+        tiempo = time.perf_counter() - inicio
+        cant_nodos = contar_nodos(arbol.root)
+    else:
+        raise RuntimeError("Algoritmo desconocido: " + str(caso['algoritmo']))
+
+    return {
+        'filas': len(df),
+        'tiempo_s': tiempo,
+        'rss_pico_mb': rss_pico_mb(),
+        'rss_datos_mb': rss_datos,
+        'nodos': cant_nodos,
+        'nodos_por_segundo': cant_nodos / tiempo if tiempo > 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de entrenamiento de los árboles de decisión.")
+    parser.add_argument('--salida', default='resultados_entrenamiento.jsonl',
+                        help="Archivo JSON Lines al que se agregan los resultados")
+    parser.add_argument('--algoritmos', nargs='+', default=[ALGORITMOS.c45, ALGORITMOS.c45_multirama,
+                                                           ALGORITMOS.arbol_decision],
+                        choices=[ALGORITMOS.c45, ALGORITMOS.c45_multirama, ALGORITMOS.arbol_decision])
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument('--escalas', nargs='+', type=int, default=ESCALAS)
+    parser.add_argument('--repeticiones', type=int, default=1, help="Cantidad de ejecuciones de cada caso")
+    parser.add_argument('--tiempo-limite', type=float, default=1800,
+                        help="Segundos máximos por ejecución; los casos que lo superan se registran como agotados")
+    parser.add_argument('--caso', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    # Proceso hijo: ejecuta un único caso e imprime el resultado
+    if argumentos.caso is not None:
+        print(json.dumps(ejecutar_caso(json.loads(argumentos.caso))))
+        return
+
+    entorno = describir_entorno()
+    for caso in generar_casos(argumentos.algoritmos, argumentos.datasets, argumentos.escalas):
+        for repeticion in range(argumentos.repeticiones):
+            resultado = ejecutar_en_subproceso('benchmarks.entrenamiento', caso, argumentos.tiempo_limite)
+            resultado = {**entorno, 'benchmark': 'entrenamiento', 'repeticion': repeticion, **resultado}
+            guardar_resultado(argumentos.salida, resultado)
+
+            detalle = (f"{resultado['tiempo_s']:.3f} s, {resultado['nodos']} nodos, "
+                       f"{resultado['rss_pico_mb']:.0f} MB") if resultado['estado'] == 'ok' else resultado['estado']
+            nombre_caso = ' '.join(str(valor) for valor in caso.values() if valor is not None)
+            print(f"{nombre_caso}: {detalle}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
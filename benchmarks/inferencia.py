@@ -0,0 +1,175 @@
+# Benchmark de inferencia.
+#
+# Entrena árboles de distinta profundidad (barriendo umbral_ganancia en ArbolDecision y max_depth en
+# arbol_decision.algoritmo.C45), los guarda en disco y, para cada uno, mide en un proceso nuevo:
+#   - en frío: el tiempo de carga del modelo y el de la primera predicción individual y de cada lote;
+#   - en caliente: la latencia p50/p99 de la predicción individual y las filas por segundo de la predicción por
+#     lotes para varios tamaños de lote.
+# Agrega una línea JSON por modelo al archivo de resultados. Uso (desde la raíz del repositorio):
+#
+#   python -m benchmarks.inferencia --salida resultados/inferencia.jsonl
+#   python -m benchmarks.inferencia --algoritmos arbol_decision --umbrales 0.001 0.05 --tamanos-lote 1 1000
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.comun import (ALGORITMOS, DATASETS, NOMBRE_OBJETIVO, calcular_profundidad, cargar_dataset,
+                              contar_nodos, describir_entorno, ejecutar_en_subproceso, guardar_resultado,
+                              matriz_c45)
+
+UMBRALES_GANANCIA = [0.001, 0.01, 0.05, 0.1]
+PROFUNDIDADES_MAXIMAS = [2, 4, 8, 16, 100]
+TAMANOS_LOTE = [1, 100, 10_000, 1_000_000]
+# Tiempo mínimo de medición de cada tamaño de lote en caliente, en segundos
+TIEMPO_MINIMO_LOTE = 0.5
+
+
+# Entrena un modelo, lo guarda en 'directorio' y devuelve el caso a medir (sin los resultados)
+def preparar_modelo(algoritmo: str, nombre_dataset: str, parametro: float, directorio: str) -> dict:
+    df = cargar_dataset(nombre_dataset)
+    if algoritmo == ALGORITMOS.arbol_decision:
+        from mi_arbol_decision.algoritmo3 import ArbolDecision
+        from mi_arbol_decision.serializacion import guardar_arbol
+        arbol = ArbolDecision(umbral_ganancia=parametro)
+        arbol.entrenar(df, NOMBRE_OBJETIVO)
+        ruta_modelo = os.path.join(directorio, f"{algoritmo}_{nombre_dataset}_{parametro}.arbol")
+        guardar_arbol(arbol, ruta_modelo)
+        raiz, nombre_parametro = arbol.raiz_arbol, 'umbral_ganancia'
+    else:
+        from arbol_decision.algoritmo import C45
+        X, y = matriz_c45(df)
+        arbol = C45(max_depth=int(parametro))
+        arbol.fit(X, y)
+        ruta_modelo = os.path.join(directorio, f"{algoritmo}_{nombre_dataset}_{int(parametro)}.pkl")
+        with open(ruta_modelo, 'wb') as archivo:
+            pickle.dump(arbol, archivo)
+        raiz, nombre_parametro = arbol.root, 'max_depth'
+
+    return {'algoritmo': algoritmo, 'dataset': nombre_dataset, nombre_parametro: parametro, 'modelo': ruta_modelo,
+            'nodos': contar_nodos(raiz), 'profundidad': calcular_profundidad(raiz)}
+
+
+def cargar_modelo(caso: dict):
+    if caso['algoritmo'] == ALGORITMOS.arbol_decision:
+        from mi_arbol_decision.serializacion import cargar_arbol
+        return cargar_arbol(caso['modelo'])
+    with open(caso['modelo'], 'rb') as archivo:
+        return pickle.load(archivo)
+
+
+# Devuelve las funciones de predicción individual y por lote del modelo y sus entradas: una lista de instancias
+# individuales y un generador de lotes de un tamaño dado (las filas del dataset se repiten si hace falta)
+def preparar_entradas(caso: dict, modelo):
+    df = cargar_dataset(caso['dataset']).drop(columns=NOMBRE_OBJETIVO)
+    if caso['algoritmo'] == ALGORITMOS.arbol_decision:
+        instancias = df.to_dict('records')
+        return modelo.predecir, modelo.predecir_lote, instancias, lambda tamano: df.iloc[np.arange(tamano) % len(df)]
+
+    X, _ = matriz_c45(cargar_dataset(caso['dataset']))
+    instancias = [X[fila:fila + 1] for fila in range(len(X))]
+    return modelo.predict, modelo.predict, instancias, lambda tamano: X[np.arange(tamano) % len(X)]
+
+
+# Ejecuta las mediciones de un modelo en el proceso actual
+def ejecutar_caso(caso: dict) -> dict:
+    inicio = time.perf_counter()
+    modelo = cargar_modelo(caso)
+    tiempo_carga = time.perf_counter() - inicio
+    predecir, predecir_lote, instancias, generar_lote = preparar_entradas(caso, modelo)
+    lotes = {tamano: generar_lote(tamano) for tamano in caso['tamanos_lote']}
+
+    # En frío: primera predicción individual y primera predicción de cada tamaño de lote
+    inicio = time.perf_counter()
+    predecir(instancias[0])
+    primera_prediccion = time.perf_counter() - inicio
+    primer_lote = {}
+    for tamano, lote in lotes.items():
+        inicio = time.perf_counter()
+        predecir_lote(lote)
+        primer_lote[str(tamano)] = time.perf_counter() - inicio
+
+    # En caliente: latencia de cada predicción individual, recorriendo las filas del dataset
+    latencias = np.empty(caso['predicciones_individuales'])
+    for numero in range(len(latencias)):
+        instancia = instancias[numero % len(instancias)]
+        inicio = time.perf_counter()
+        predecir(instancia)
+        latencias[numero] = time.perf_counter() - inicio
+
+    filas_por_segundo = {}
+    for tamano, lote in lotes.items():
+        cant_repeticiones, tiempo_total = 0, 0.0
+        while tiempo_total < TIEMPO_MINIMO_LOTE:
+            inicio = time.perf_counter()
+            predecir_lote(lote)
+            tiempo_total += time.perf_counter() - inicio
+            cant_repeticiones += 1
+        filas_por_segundo[str(tamano)] = tamano * cant_repeticiones / tiempo_total
+
+    return {
+        'frio': {'carga_s': tiempo_carga, 'primera_prediccion_s': primera_prediccion, 'primer_lote_s': primer_lote},
+        'caliente': {
+            'latencia_p50_us': float(np.percentile(latencias, 50)) * 1e6,
+            'latencia_p99_us': float(np.percentile(latencias, 99)) * 1e6,
+            'filas_por_segundo': filas_por_segundo,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de inferencia de los árboles de decisión.")
+    parser.add_argument('--salida', default='resultados_inferencia.jsonl',
+                        help="Archivo JSON Lines al que se agregan los resultados")
+    parser.add_argument('--algoritmos', nargs='+', default=[ALGORITMOS.arbol_decision, ALGORITMOS.c45],
+                        choices=[ALGORITMOS.arbol_decision, ALGORITMOS.c45])
+    parser.add_argument('--datasets', nargs='+', default=['balanceado'], choices=list(DATASETS))
+    parser.add_argument('--umbrales', nargs='+', type=float, default=UMBRALES_GANANCIA,
+                        help="Valores de umbral_ganancia de ArbolDecision")
+    parser.add_argument('--profundidades', nargs='+', type=int, default=PROFUNDIDADES_MAXIMAS,
+                        help="Valores de max_depth de C45")
+    parser.add_argument('--tamanos-lote', nargs='+', type=int, default=TAMANOS_LOTE)
+    parser.add_argument('--predicciones-individuales', type=int, default=10_000,
+                        help="Cantidad de predicciones individuales medidas en caliente")
+    parser.add_argument('--tiempo-limite', type=float, default=1800, help="Segundos máximos por modelo")
+    parser.add_argument('--caso', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    # Proceso hijo: mide un único modelo e imprime el resultado
+    if argumentos.caso is not None:
+        print(json.dumps(ejecutar_caso(json.loads(argumentos.caso))))
+        return
+
+    entorno = describir_entorno()
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre_dataset in argumentos.datasets:
+            for algoritmo in argumentos.algoritmos:
+                parametros = argumentos.umbrales if algoritmo == ALGORITMOS.arbol_decision \
+                    else argumentos.profundidades
+                for parametro in parametros:
+                    caso = preparar_modelo(algoritmo, nombre_dataset, parametro, directorio)
+                    caso.update(tamanos_lote=argumentos.tamanos_lote,
+                                predicciones_individuales=argumentos.predicciones_individuales)
+                    resultado = ejecutar_en_subproceso('benchmarks.inferencia', caso, argumentos.tiempo_limite)
+                    resultado = {**entorno, 'benchmark': 'inferencia', **resultado}
+                    del resultado['modelo']
+                    guardar_resultado(argumentos.salida, resultado)
+
+                    if resultado['estado'] == 'ok':
+                        caliente = resultado['caliente']
+                        detalle = (f"p50 {caliente['latencia_p50_us']:.1f} us, "
+                                   f"p99 {caliente['latencia_p99_us']:.1f} us, "
+                                   + ", ".join(f"lote {tamano}: {filas:,.0f} filas/s"
+                                               for tamano, filas in caliente['filas_por_segundo'].items()))
+                    else:
+                        detalle = resultado['estado']
+                    print(f"{algoritmo} {nombre_dataset} {parametro} ({caso['nodos']} nodos, profundidad "
+                          f"{caso['profundidad']}): {detalle}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
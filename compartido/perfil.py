@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+# Contexto que se devuelve cuando el perfil está desactivado: no mide nada y no reserva memoria
+_SIN_MEDICION = nullcontext()
+
+
+# Fábricas de los diccionarios por profundidad. Son funciones del módulo (y no lambdas) para que un Perfil,
+# y con él el árbol que lo guarda, se pueda serializar con pickle
+def _tiempos_por_fase() -> defaultdict:
+    return defaultdict(float)
+
+
+def _contadores_por_nombre() -> defaultdict:
+    return defaultdict(int)
+
+
+# Tiempos por fase y contadores de un entrenamiento. Lo usan ArbolDecision (mi_arbol_decision) y C45
+# (arbol_decision), por lo que no depende de ninguno de los dos paquetes.
+class Perfil:
+    def __init__(self, activo: bool = False):
+        # Con el perfil desactivado, medir() y contar() no hacen nada
+        self.activo: bool = activo
+        # Tiempo acumulado (en segundos) y cantidad de mediciones de cada fase, en total y por profundidad.
+        # Las fases pueden estar anidadas (por ejemplo, la búsqueda de umbrales dentro de la búsqueda de la
+        # división) y, si hay hilos trabajando en paralelo, el tiempo acumulado puede superar al transcurrido.
+        self.tiempos: dict[str, float] = defaultdict(float)
+        self.mediciones: dict[str, int] = defaultdict(int)
+        self.tiempos_por_profundidad: dict[int, dict[str, float]] = defaultdict(_tiempos_por_fase)
+        # Contadores (candidatos evaluados, filas recorridas, nodos creados, motivos de hoja...), en total y por
+        # profundidad
+        self.contadores: dict[str, int] = defaultdict(int)
+        self.contadores_por_profundidad: dict[int, dict[str, int]] = defaultdict(_contadores_por_nombre)
+        self._bloqueo = threading.Lock()
+
+    # El bloqueo no se puede serializar: se descarta al guardar y se crea uno nuevo al cargar
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_bloqueo']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._bloqueo = threading.Lock()
+
+    # Devuelve un contexto que mide el tiempo de la fase: 'with perfil.medir("particion", profundidad): ...'
+    def medir(self, fase: str, profundidad: int | None = None):
+        if not self.activo:
+            return _SIN_MEDICION
+        return _Medicion(self, fase, profundidad)
+
+    def contar(self, contador: str, cantidad: int = 1, profundidad: int | None = None) -> None:
+        if not self.activo:
+            return
+        with self._bloqueo:
+            self.contadores[contador] += cantidad
+            if profundidad is not None:
+                self.contadores_por_profundidad[profundidad][contador] += cantidad
+
+    def registrar_hoja(self, motivo: str, profundidad: int | None = None) -> None:
+        self.contar('hojas', 1, profundidad)
+        self.contar('hojas.' + motivo, 1, profundidad)
+
+    def _registrar_tiempo(self, fase: str, profundidad: int | None, segundos: float) -> None:
+        with self._bloqueo:
+            self.tiempos[fase] += segundos
+            self.mediciones[fase] += 1
+            if profundidad is not None:
+                self.tiempos_por_profundidad[profundidad][fase] += segundos
+
+    # Devuelve los tiempos y contadores acumulados como diccionarios simples (por ejemplo, para guardarlos en JSON)
+    def reporte(self) -> dict:
+        with self._bloqueo:
+            return {
+                'tiempos': dict(self.tiempos),
+                'mediciones': dict(self.mediciones),
+                'contadores': dict(self.contadores),
+                'tiempos_por_profundidad': {profundidad: dict(tiempos) for profundidad, tiempos
+                                            in sorted(self.tiempos_por_profundidad.items())},
+                'contadores_por_profundidad': {profundidad: dict(contadores) for profundidad, contadores
+                                               in sorted(self.contadores_por_profundidad.items())},
+            }
+
+    def __str__(self):
+        if not self.activo:
+            return "Perfil desactivado"
+        reporte = self.reporte()
+        lineas = ["--- Tiempos por fase ---"]
+        for fase, segundos in sorted(reporte['tiempos'].items(), key=lambda item: -item[1]):
+            lineas.append(f"{fase:<28}{segundos:>10.4f} s{reporte['mediciones'][fase]:>10} mediciones")
+        lineas.append("--- Contadores ---")
+        for contador, cantidad in sorted(reporte['contadores'].items()):
+            lineas.append(f"{contador:<28}{cantidad:>12}")
+        lineas.append("--- Por profundidad ---")
+        for profundidad in sorted(set(reporte['tiempos_por_profundidad']) | set(reporte['contadores_por_profundidad'])):
+            tiempos = reporte['tiempos_por_profundidad'].get(profundidad, {})
+            contadores = reporte['contadores_por_profundidad'].get(profundidad, {})
+            detalle = [f"{fase}={segundos:.4f}s" for fase, segundos in tiempos.items()]
+            detalle += [f"{contador}={cantidad}" for contador, cantidad in contadores.items()]
+            lineas.append(f"{profundidad:>4}: " + ", ".join(detalle))
+        return "\n".join(lineas)
+
+
+class _Medicion:
+    def __init__(self, perfil: Perfil, fase: str, profundidad: int | None):
+        self.perfil: Perfil = perfil
+        self.fase: str = fase
+        self.profundidad: int | None = profundidad
+        self.inicio: float = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.perfil._registrar_tiempo(self.fase, self.profundidad, time.perf_counter() - self.inicio)
+        return False
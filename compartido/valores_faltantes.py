@@ -0,0 +1,9 @@
+# Tratamiento de los valores faltantes, común a ArbolDecision (mi_arbol_decision) y C45 (arbol_decision)
+class VALORES_FALTANTES:
+    # Las instancias sin valor en el atributo evaluado no se cuentan en ninguna rama al buscar la división y no
+    # pasan a ningún hijo al dividir el nodo
+    descartar = 'descartar'
+    # Como en C4.5: la ganancia se calcula con las instancias que tienen valor y se multiplica por la proporción
+    # (en peso) de esas instancias; al dividir, las instancias sin valor pasan a todas las ramas con un peso
+    # proporcional al peso de cada rama, y al predecir se reparten del mismo modo entre las ramas
+    fraccionar = 'fraccionar'
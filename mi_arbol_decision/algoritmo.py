@@ -1,45 +1,54 @@
 import numpy as np
 from pandas import DataFrame, Series
 
+from mi_arbol_decision.traza import MOTIVOS_HOJA, NIVELES_TRAZA, Traza
+
 class ArbolDecision:
-    def __init__(self, umbral_ganancia: float = 0.001):
+    def __init__(self, umbral_ganancia: float = 0.001, verbosidad: int = NIVELES_TRAZA.silencioso):
         self.raiz_arbol: Nodo | None = None
         self.df: DataFrame | None = None
         self.nombre_objetivo: str = ''
         self.umbral_ganancia = umbral_ganancia
+        self.verbosidad: int = verbosidad
+        self.traza: Traza = Traza(verbosidad)
 
     def entrenar(self, df: DataFrame, nombre_objetivo: str):
-        print("----- FASE DE ENTRENAMIENTO -----")
+        self.traza = Traza(self.verbosidad)
+        self.traza.imprimir("----- FASE DE ENTRENAMIENTO -----")
         self.df: DataFrame = df
         self.nombre_objetivo: str = nombre_objetivo
         lista_atributos = list(df.drop(nombre_objetivo, axis=1).columns)
         self.raiz_arbol = self._construir_arbol(df, lista_atributos)
 
-    def _construir_arbol(self, df: DataFrame, atributos_disponibles: list[str]):
+    def _construir_arbol(self, df: DataFrame, atributos_disponibles: list[str], profundidad: int = 0):
         columna_clases = df[self.nombre_objetivo]
         clase_mas_comun = columna_clases.mode()[0] if not columna_clases.empty else None
 
-        print("\n--- DataFrame ---")
-        print(df)
+        self.traza.imprimir("\n--- DataFrame ---")
+        self.traza.imprimir(df)
 
         if self._tiene_una_sola_clase(columna_clases):
-            print("Criterio de parada 1: hay una sola clase en este conjunto")
-            print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+            self.traza.imprimir("Criterio de parada 1: hay una sola clase en este conjunto")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(df), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.una_sola_clase)
             return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
         elif not self._hay_atributos_disponibles(atributos_disponibles):
-            print("Criterio de parada 2: no hay más atributos disponibles para esta rama")
-            print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+            self.traza.imprimir("Criterio de parada 2: no hay más atributos disponibles para esta rama")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(df), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.sin_atributos)
             return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
         else:
-            print("Se expande el árbol")
+            self.traza.imprimir("Se expande el árbol")
             # Entropia del conjunto de datos (p0)
             entropia_conjunto = calcular_entropia(columna_clases)
-            print("\nEntropia del conjunto de datos (p0): " + str(entropia_conjunto))
+            self.traza.imprimir("\nEntropia del conjunto de datos (p0):", entropia_conjunto)
 
             entropia_atributos: dict[str, float] = dict()
             for atributo in atributos_disponibles:
                 entropia_atributos[atributo] = self._calcular_entropia_atributo(df, atributo)
-            print("\nEntropia de cada atributo (pi): " + str(entropia_atributos))
+            self.traza.imprimir("\nEntropia de cada atributo (pi):", entropia_atributos)
 
             # Nombre del mejor atributo (Ag)
             mejor_atributo = self._elegir_mejor_atributo(entropia_conjunto, entropia_atributos)
@@ -47,30 +56,38 @@ class ArbolDecision:
             entropia_mejor_atributo = entropia_atributos[mejor_atributo]
             ganancia_mejor_atributo = entropia_conjunto - entropia_mejor_atributo
 
-            print("Mejor atributo (ganancia=" + str(ganancia_mejor_atributo) + "): " + mejor_atributo)
+            self.traza.imprimir("Mejor atributo (ganancia=" + str(ganancia_mejor_atributo) + "): " + mejor_atributo)
 
             if ganancia_mejor_atributo < self.umbral_ganancia:
-                print("El atributo '" + mejor_atributo + "' no reduce significativamente la impureza " + entropia_conjunto)
-                print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+                self.traza.imprimir(
+                    "El atributo '" + mejor_atributo + "' no reduce significativamente la impureza", entropia_conjunto)
+                self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+                self.traza.registrar('hoja', profundidad, len(df), atributo=mejor_atributo,
+                                     ganancia=ganancia_mejor_atributo, clase=clase_mas_comun,
+                                     motivo=MOTIVOS_HOJA.ganancia_insuficiente)
                 return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
 
             # Crear un nodo de decisión y construir los hijos
-            print("Se crea un nuevo nodo de decision con el atributo: " + mejor_atributo)
+            self.traza.imprimir("Se crea un nuevo nodo de decision con el atributo: " + mejor_atributo)
+            self.traza.registrar('division', profundidad, len(df), atributo=mejor_atributo,
+                                 ganancia=ganancia_mejor_atributo)
             nodos_hijos = {}
-            print("Valores posibles del atributo: ")
-            print(df[mejor_atributo].unique())
+            if self.traza.es_detallada:
+                self.traza.imprimir("Valores posibles del atributo: ")
+                self.traza.imprimir(df[mejor_atributo].unique())
             # Se particiona el dataframe por cada valor único del mejor atributo seleccionado
             for valor_atributo, df_valor_atributo in df.groupby(mejor_atributo):
-                print(f"\n-- Subconjunto del dataframe para valor: {valor_atributo} --")
-                print(df_valor_atributo)
+                self.traza.imprimir("\n-- Subconjunto del dataframe para valor:", valor_atributo, "--")
+                self.traza.imprimir(df_valor_atributo)
                 if len(df_valor_atributo) == 0:
                     continue
 
                 nuevos_atributos_disponibles = atributos_disponibles.copy()
                 nuevos_atributos_disponibles.remove(mejor_atributo)
-                print("Atributos disponibles: ", atributos_disponibles)
-                print("Nuevos atributos disponibles: ", nuevos_atributos_disponibles)
-                nodos_hijos[valor_atributo] = self._construir_arbol(df_valor_atributo, nuevos_atributos_disponibles)
+                self.traza.imprimir("Atributos disponibles: ", atributos_disponibles)
+                self.traza.imprimir("Nuevos atributos disponibles: ", nuevos_atributos_disponibles)
+                nodos_hijos[valor_atributo] = self._construir_arbol(df_valor_atributo, nuevos_atributos_disponibles,
+                                                                    profundidad + 1)
 
             return Nodo(atributo=mejor_atributo, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun)
 
@@ -132,8 +149,4 @@ def calcular_entropia(s: Series):
     if entropia != 0:
         entropia *= -1
 
-    print("\nSerie:")
-    print(s)
-    print("Entropia: ", entropia)
-
     return entropia
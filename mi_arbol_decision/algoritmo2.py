@@ -3,19 +3,23 @@ from pandas import DataFrame, Series
 
 from mi_arbol_decision.entropia import calcular_entropia
 from mi_arbol_decision.nodo import Nodo
+from mi_arbol_decision.traza import MOTIVOS_HOJA, NIVELES_TRAZA, Traza
 
 # TODO 1: implementar metodo para predecir la clase de una instancia dada
 # TODO 2: flexibilizar el algoritmo para poder usar diferentes funciones de impureza
 
 class ArbolDecision:
-    def __init__(self, umbral_ganancia: float = 0.001):
+    def __init__(self, umbral_ganancia: float = 0.001, verbosidad: int = NIVELES_TRAZA.silencioso):
         self.raiz_arbol: Nodo | None = None
         self.df: DataFrame | None = None
         self.nombre_objetivo: str = ''
         self.umbral_ganancia = umbral_ganancia
+        self.verbosidad: int = verbosidad
+        self.traza: Traza = Traza(verbosidad)
 
     def entrenar(self, df: DataFrame, nombre_objetivo: str) -> None:
-        print("----- FASE DE ENTRENAMIENTO -----")
+        self.traza = Traza(self.verbosidad)
+        self.traza.imprimir("----- FASE DE ENTRENAMIENTO -----")
         self.df: DataFrame = df
         self.nombre_objetivo: str = nombre_objetivo
         self.raiz_arbol = self._construir_arbol(df, self._obtener_lista_atributos())
@@ -25,37 +29,43 @@ class ArbolDecision:
             return list()
         return list(self.df.drop(self.nombre_objetivo, axis=1).columns)
 
-    def _construir_arbol(self, df: DataFrame, atributos_disponibles: list[str]) -> Nodo:
+    def _construir_arbol(self, df: DataFrame, atributos_disponibles: list[str], profundidad: int = 0) -> Nodo:
         columna_clases: Series = df[self.nombre_objetivo]
         clase_mas_comun = columna_clases.mode()[0] if not columna_clases.empty else None
 
-        print("\n--- DataFrame ---")
-        print(df)
+        self.traza.imprimir("\n--- DataFrame ---")
+        self.traza.imprimir(df)
 
         if self._tiene_una_sola_clase(columna_clases):
-            print("Criterio de parada 1: hay una sola clase en este conjunto")
-            print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+            self.traza.imprimir("Criterio de parada 1: hay una sola clase en este conjunto")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(df), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.una_sola_clase)
             return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
         elif not self._hay_atributos_disponibles(atributos_disponibles):
-            print("Criterio de parada 2: no hay más atributos disponibles para esta rama")
-            print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+            self.traza.imprimir("Criterio de parada 2: no hay más atributos disponibles para esta rama")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(df), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.sin_atributos)
             return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
         else:
-            print("Se expande el árbol")
+            self.traza.imprimir("Se expande el árbol")
 
             # Entropia del conjunto de datos (p0)
             entropia_conjunto: float = calcular_entropia(columna_clases)
-            print("\nEntropia del conjunto de datos (p0): " + str(entropia_conjunto))
+            self.traza.imprimir("\nEntropia del conjunto de datos (p0):", entropia_conjunto)
 
             mejor_atributo, ganancia_mejor_atributo, umbral_mejor_atributo = (
                 self._encontrar_mejor_atributo(df, atributos_disponibles, entropia_conjunto)
             )
 
             if ganancia_mejor_atributo < self.umbral_ganancia:
-                print(
-                    "El atributo '" + mejor_atributo + "' no reduce significativamente la impureza " + str(
-                        entropia_conjunto))
-                print("Se crea un nodo hoja con clase: " + clase_mas_comun)
+                self.traza.imprimir(
+                    "El atributo '" + mejor_atributo + "' no reduce significativamente la impureza", entropia_conjunto)
+                self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+                self.traza.registrar('hoja', profundidad, len(df), atributo=mejor_atributo,
+                                     ganancia=ganancia_mejor_atributo, umbral=umbral_mejor_atributo,
+                                     clase=clase_mas_comun, motivo=MOTIVOS_HOJA.ganancia_insuficiente)
                 return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
 
             # Crear un nodo de decisión y construir los hijos
@@ -63,39 +73,46 @@ class ArbolDecision:
             es_atributo_categorico: bool = umbral_mejor_atributo is None
             nodos_hijos: dict[str, Nodo] = {}
 
-            print(f"Mejor atributo para dividir: '{mejor_atributo}' (Ganancia={ganancia_mejor_atributo:.4f})")
+            self.traza.imprimir(f"Mejor atributo para dividir: '{mejor_atributo}' "
+                                f"(Ganancia={ganancia_mejor_atributo:.4f})")
+            self.traza.registrar('division', profundidad, len(df), atributo=mejor_atributo,
+                                 ganancia=ganancia_mejor_atributo, umbral=umbral_mejor_atributo)
             if es_atributo_categorico:
                 # Los atributos categóricos se pueden usar una sola vez en una rama
                 # Los atributos continuos pueden volver a usarse en sub-ramas con otros umbrales
                 nuevos_atributos_disponibles.remove(mejor_atributo)
 
-                print("Valores posibles del atributo: " + str(df[mejor_atributo].unique()))
+                if self.traza.es_detallada:
+                    self.traza.imprimir("Valores posibles del atributo:", df[mejor_atributo].unique())
                 # Se particiona el dataframe por cada valor único del mejor atributo seleccionado
                 for valor_atributo, df_valor_atributo in df.groupby(mejor_atributo):
-                    print(f"\n-- Subconjunto del dataframe para valor: {valor_atributo} --")
-                    print(df_valor_atributo)
+                    self.traza.imprimir("\n-- Subconjunto del dataframe para valor:", valor_atributo, "--")
+                    self.traza.imprimir(df_valor_atributo)
                     if len(df_valor_atributo) == 0:
                         continue
 
                     nodos_hijos[str(valor_atributo)] = self._construir_arbol(df_valor_atributo,
-                                                                             nuevos_atributos_disponibles)
+                                                                             nuevos_atributos_disponibles,
+                                                                             profundidad + 1)
 
                 return Nodo(atributo=mejor_atributo, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun)
             else:
-                print(f"Umbral de división: {umbral_mejor_atributo}")
+                self.traza.imprimir("Umbral de división:", umbral_mejor_atributo)
                 # Dividir el conjunto en dos ramas: <= umbral y > umbral
                 df_menor_igual = df[df[mejor_atributo] <= umbral_mejor_atributo]
                 df_mayor = df[df[mejor_atributo] > umbral_mejor_atributo]
 
-                print(f"\n-- Subconjunto del dataframe para <= {umbral_mejor_atributo}: --")
-                print(df_menor_igual)
-                print(f"\n-- Subconjunto del dataframe para < {umbral_mejor_atributo}: --")
-                print(df_mayor)
+                self.traza.imprimir("\n-- Subconjunto del dataframe para <=", umbral_mejor_atributo, "--")
+                self.traza.imprimir(df_menor_igual)
+                self.traza.imprimir("\n-- Subconjunto del dataframe para >", umbral_mejor_atributo, "--")
+                self.traza.imprimir(df_mayor)
 
                 nodos_hijos['<= ' + str(umbral_mejor_atributo)] = self._construir_arbol(df_menor_igual,
-                                                                                        nuevos_atributos_disponibles)
+                                                                                        nuevos_atributos_disponibles,
+                                                                                        profundidad + 1)
                 nodos_hijos['> ' + str(umbral_mejor_atributo)] = self._construir_arbol(df_mayor,
-                                                                                       nuevos_atributos_disponibles)
+                                                                                       nuevos_atributos_disponibles,
+                                                                                       profundidad + 1)
 
                 return Nodo(atributo=mejor_atributo, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun,
                             umbral=umbral_mejor_atributo)
@@ -1,153 +1,462 @@
-from pandas import DataFrame, Series
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
+import numpy as np
+from pandas import DataFrame
+
+from compartido.perfil import Perfil
+from compartido.valores_faltantes import VALORES_FALTANTES
+from mi_arbol_decision.compilado import ArbolCompilado, compilar_arbol
+from mi_arbol_decision.datos import (Codificacion, DatosCodificados, SubconjuntoNodo, codificar_dataframe,
+                                     discretizar_continuos)
+from mi_arbol_decision.funcion_impureza.error_clasificacion import ErrorDeClasificacion
 from mi_arbol_decision.funcion_impureza.funcion import FUNCIONES_IMPUREZA, FuncionImpureza
 from mi_arbol_decision.funcion_impureza.ganancia_informacion import GananciaDeInformacion
+from mi_arbol_decision.funcion_impureza.gini import IndiceGini
 from mi_arbol_decision.funcion_impureza.tasa_ganancia_informacion import TasaGananciaDeInformacion
+from mi_arbol_decision.histogramas import calcular_histogramas, calcular_histogramas_hijos
 from mi_arbol_decision.nodo import Nodo
+from mi_arbol_decision.particion import particionar
+from mi_arbol_decision.poda import FACTOR_CONFIANZA, calcular_profundidad, contar_nodos, podar_arbol
+from mi_arbol_decision.traza import MOTIVOS_HOJA, NIVELES_TRAZA, Traza
 
 
 class ArbolDecision:
-    def __init__(self, umbral_ganancia: float = 0.001, funcion_impureza: str = ''):
+    def __init__(self, umbral_ganancia: float = 0.001, funcion_impureza: str = '',
+                 verbosidad: int = NIVELES_TRAZA.silencioso, n_jobs: int = 1, n_jobs_construccion: int = 1,
+                 min_instancias_subarbol: int = 2000, max_bins: int | None = None, cache_atributos: bool = True,
+                 perfilar: bool = False, max_atributos: int | None = None, semilla: int | None = None,
+                 valores_faltantes: str = VALORES_FALTANTES.descartar):
         self.raiz_arbol: Nodo | None = None
-        self.df: DataFrame | None = None
+        self.arbol_compilado: ArbolCompilado | None = None
         self.nombre_objetivo: str = ''
         self.umbral_ganancia: float = umbral_ganancia
         self.nombre_funcion_impureza: str = funcion_impureza
         self.funcion_impureza: FuncionImpureza | None = None
+        self.verbosidad: int = verbosidad
+        self.traza: Traza = Traza(verbosidad)
+        # Cantidad de hilos para evaluar en paralelo los atributos candidatos de cada nodo
+        self.n_jobs: int = n_jobs
+        # Cantidad de hilos para construir subárboles en paralelo. Solo los hijos con al menos
+        # min_instancias_subarbol instancias se encolan como tareas; el resto se construye en línea.
+        self.n_jobs_construccion: int = n_jobs_construccion
+        self.min_instancias_subarbol: int = min_instancias_subarbol
+        self._ejecutor_subarboles: ThreadPoolExecutor | None = None
+        # Si se indica, cada atributo continuo se agrupa en a lo sumo max_bins bins al comenzar el entrenamiento
+        # y los umbrales se buscan sobre histogramas de clases por bin en lugar de sobre los valores ordenados
+        self.max_bins: int | None = max_bins
+        # Si un atributo no tiene ninguna división válida en un nodo (es constante en su subconjunto), tampoco la
+        # tiene en los descendientes y no se vuelve a evaluar en ellos. Las evaluaciones evitadas (aciertos) y
+        # realizadas (fallos) del último entrenamiento quedan en estadisticas_cache. Solo se aplica con un
+        # umbral_ganancia positivo, ya que un atributo constante puede tener ganancia 0.
+        self.cache_atributos: bool = cache_atributos
+        self.estadisticas_cache: dict[str, int] = {'aciertos': 0, 'fallos': 0}
+        # Protege estadisticas_cache durante la construcción paralela; solo existe mientras se entrena
+        self._bloqueo_estadisticas: threading.Lock | None = None
+        # Con perfilar=True se miden los tiempos de cada fase del entrenamiento y se cuentan candidatos evaluados,
+        # filas recorridas, nodos creados y motivos de cada hoja, en total y por profundidad. El resultado del
+        # último entrenamiento queda en 'perfil' (print(arbol.perfil) o arbol.perfil.reporte()).
+        self.perfilar: bool = perfilar
+        self.perfil: Perfil = Perfil(perfilar)
+        # Si se indica, cada nodo elige su división entre a lo sumo max_atributos atributos sorteados al azar
+        # (como en un bosque aleatorio). 'semilla' hace reproducible el sorteo, aun con construcción paralela.
+        self.max_atributos: int | None = max_atributos
+        self.semilla: int | None = semilla
+        # Tratamiento de las instancias sin valor en un atributo (ver VALORES_FALTANTES). Con 'fraccionar' los
+        # conteos de clases de los nodos son sumas de pesos y la predicción reparte las instancias sin valor
+        # entre todas las ramas.
+        self.valores_faltantes: str = valores_faltantes
+        # Atributos, categorías y clases del conjunto de entrenamiento (sin los datos)
+        self.codificacion: Codificacion | None = None
+        # Datos codificados y DataFrame original: solo se conservan durante el entrenamiento
+        self.datos: DatosCodificados | None = None
+        self._df_entrenamiento: DataFrame | None = None
+        # Permutación de las filas del conjunto codificado: cada nodo ocupa un segmento del arreglo
+        self._indices: np.ndarray | None = None
 
     def entrenar(self, df: DataFrame, nombre_objetivo: str) -> None:
-        print("----- FASE DE ENTRENAMIENTO -----")
-        self.df: DataFrame = df
+        self.perfil = Perfil(self.perfilar)
+        with self.perfil.medir('entrenamiento'):
+            self._entrenar(df, nombre_objetivo)
+
+    # Entrena a partir de datos ya codificados (por ejemplo, compartidos entre los árboles de un bosque) usando
+    # solo las filas de 'indices', que puede tener filas repetidas (muestra bootstrap). Sin 'indices' usa todas.
+    def entrenar_codificado(self, datos: DatosCodificados, nombre_objetivo: str,
+                            indices: np.ndarray | None = None) -> None:
+        if self.verbosidad >= NIVELES_TRAZA.detallado:
+            raise RuntimeError("La traza detallada necesita el DataFrame de entrenamiento: use entrenar().")
+        if indices is None:
+            indices = np.arange(datos.cant_instancias)
+        self.perfil = Perfil(self.perfilar)
+        with self.perfil.medir('entrenamiento'):
+            self._entrenar_datos(datos, nombre_objetivo, indices, None)
+
+    def _entrenar(self, df: DataFrame, nombre_objetivo: str) -> None:
+        # El DataFrame se codifica una única vez; el resto del entrenamiento trabaja con índices de filas
+        with self.perfil.medir('codificacion'):
+            datos = codificar_dataframe(df, nombre_objetivo)
+        self._entrenar_datos(datos, nombre_objetivo, np.arange(datos.cant_instancias), df)
+
+    def _entrenar_datos(self, datos: DatosCodificados, nombre_objetivo: str, indices: np.ndarray,
+                        df: DataFrame | None) -> None:
+        if self.valores_faltantes not in (VALORES_FALTANTES.descartar, VALORES_FALTANTES.fraccionar):
+            raise RuntimeError("Tratamiento de valores faltantes desconocido: " + str(self.valores_faltantes))
+        self.traza = Traza(self.verbosidad)
+        self.traza.imprimir("----- FASE DE ENTRENAMIENTO -----")
         self.nombre_objetivo: str = nombre_objetivo
         self.funcion_impureza = self._obtener_funcion_impureza(nombre_objetivo)
-        self.raiz_arbol = self._construir_arbol(df, self._obtener_lista_atributos())
+        self.funcion_impureza.perfil = self.perfil
+        self.datos = datos
+        self.codificacion = self.datos.codificacion
+        if self.max_bins is not None:
+            with self.perfil.medir('discretizacion'):
+                discretizar_continuos(self.datos, self.max_bins)
+        # El DataFrame original solo se usa para mostrar los subconjuntos en la traza detallada
+        self._df_entrenamiento = df if self.traza.es_detallada else None
+        # Se copia porque la construcción reordena el arreglo en el lugar
+        self._indices = np.array(indices)
+        self.estadisticas_cache = {'aciertos': 0, 'fallos': 0}
+        self._bloqueo_estadisticas = threading.Lock()
+        if self.n_jobs_construccion > 1:
+            self._ejecutor_subarboles = ThreadPoolExecutor(max_workers=self.n_jobs_construccion)
+        try:
+            # El conteo de clases se calcula sobre las instancias solo en la raíz; los hijos lo reciben de la división
+            # Al fraccionar los valores faltantes, todas las instancias empiezan con peso 1
+            pesos = np.ones(len(self._indices)) if self.valores_faltantes == VALORES_FALTANTES.fraccionar else None
+            conteo_clases = np.bincount(self.datos.clases[self._indices], weights=pesos,
+                                        minlength=self.datos.cant_clases)
+            histogramas = None
+            if self.max_bins is not None:
+                with self.perfil.medir('histogramas', 0):
+                    histogramas = calcular_histogramas(self.datos, self._indices, pesos)
+            generador = np.random.default_rng(self.semilla) if self.max_atributos is not None else None
+            raiz_arbol = self._construir_arbol(self._indices, self._obtener_lista_atributos(), conteo_clases,
+                                               histogramas=histogramas, generador=generador, pesos=pesos)
+            self.raiz_arbol = self._resolver_subarboles(raiz_arbol)
+        finally:
+            if self._ejecutor_subarboles is not None:
+                self._ejecutor_subarboles.shutdown()
+                self._ejecutor_subarboles = None
+            self.funcion_impureza.cerrar()
+            self._bloqueo_estadisticas = None
+            self._indices = None
+            self.datos = None
+            self._df_entrenamiento = None
+
+        with self.perfil.medir('compilacion'):
+            self.compilar()
 
     def _obtener_funcion_impureza(self, nombre_objetivo: str) -> FuncionImpureza:
         if self.nombre_funcion_impureza == FUNCIONES_IMPUREZA.ganancia_informacion:
-            return GananciaDeInformacion(nombre_objetivo)
+            return GananciaDeInformacion(nombre_objetivo, self.n_jobs)
         elif self.nombre_funcion_impureza == FUNCIONES_IMPUREZA.tasa_ganancia_informacion:
-            return TasaGananciaDeInformacion(nombre_objetivo)
+            return TasaGananciaDeInformacion(nombre_objetivo, self.n_jobs)
+        elif self.nombre_funcion_impureza == FUNCIONES_IMPUREZA.indice_gini:
+            return IndiceGini(nombre_objetivo, self.n_jobs)
+        elif self.nombre_funcion_impureza == FUNCIONES_IMPUREZA.error_clasificacion:
+            return ErrorDeClasificacion(nombre_objetivo, self.n_jobs)
         else:  # Uso ganancia de informacion por defecto
-            return GananciaDeInformacion(nombre_objetivo)
+            return GananciaDeInformacion(nombre_objetivo, self.n_jobs)
 
     def _obtener_lista_atributos(self) -> list[str]:
-        if self.df is None or self.nombre_objetivo.strip() == '':
+        if self.codificacion is None:
             return list()
-        return list(self.df.drop(self.nombre_objetivo, axis=1).columns)
+        return list(self.codificacion.atributos)
 
-    def _construir_arbol(self, df: DataFrame, atributos_disponibles: list[str]) -> Nodo:
-        columna_clases: Series = df[self.nombre_objetivo]
-        clase_mas_comun = columna_clases.mode()[0] if not columna_clases.empty else None
+    # Construye el árbol para las instancias de 'indices', un segmento del arreglo de índices del entrenamiento.
+    # Al dividir un nodo, su segmento se reordena en el lugar de modo que cada hijo ocupe un sub-segmento.
+    # 'conteo_clases' es la cantidad de instancias de cada clase en el segmento y 'histogramas' son los
+    # histogramas de los atributos continuos en el nodo (solo si se entrena con max_bins).
+    # 'atributos_descartados' son los atributos sin división válida en algún ancestro (ver cache_atributos).
+    # 'generador' sortea los atributos candidatos del nodo (solo con max_atributos); cada hijo recibe uno propio.
+    # 'pesos' es el peso de cada instancia (solo con VALORES_FALTANTES.fraccionar); en ese caso cada hijo recibe
+    # sus propios arreglos de índices y pesos, ya que las instancias sin valor pasan a más de una rama.
+    def _construir_arbol(self, indices: np.ndarray, atributos_disponibles: list[str], conteo_clases: np.ndarray,
+                         profundidad: int = 0, histogramas: dict[str, np.ndarray] | None = None,
+                         atributos_descartados: frozenset[str] = frozenset(),
+                         generador: np.random.Generator | None = None, pesos: np.ndarray | None = None) -> Nodo:
+        self.perfil.contar('nodos', 1, profundidad)
+        # Ante empates se elige la clase de menor valor, igual que mode()
+        clase_mas_comun = self.datos.codificacion.etiquetas_clases[np.argmax(conteo_clases)] \
+            if len(indices) > 0 else None
 
-        print("\n--- DataFrame ---")
-        print(df)
+        if self.traza.es_detallada:
+            self.traza.imprimir("\n--- DataFrame ---")
+            self.traza.imprimir(self._df_entrenamiento.iloc[indices])
 
-        if self._tiene_una_sola_clase(columna_clases):
-            print("Criterio de parada 1: hay una sola clase en este conjunto")
-            print("Se crea un nodo hoja con clase: " + str(clase_mas_comun))
-            return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
+        if self._tiene_una_sola_clase(conteo_clases):
+            self.traza.imprimir("Criterio de parada 1: hay una sola clase en este conjunto")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(indices), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.una_sola_clase)
+            self.perfil.registrar_hoja(MOTIVOS_HOJA.una_sola_clase, profundidad)
+            return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun, conteo_clases=conteo_clases)
         elif not self._hay_atributos_disponibles(atributos_disponibles):
-            print("Criterio de parada 2: no hay más atributos disponibles para esta rama")
-            print("Se crea un nodo hoja con clase: " + str(clase_mas_comun))
-            return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
+            self.traza.imprimir("Criterio de parada 2: no hay más atributos disponibles para esta rama")
+            self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+            self.traza.registrar('hoja', profundidad, len(indices), clase=clase_mas_comun,
+                                 motivo=MOTIVOS_HOJA.sin_atributos)
+            self.perfil.registrar_hoja(MOTIVOS_HOJA.sin_atributos, profundidad)
+            return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun, conteo_clases=conteo_clases)
         else:
-            print("Se expande el árbol")
-            mejor_atributo = self.funcion_impureza.encontrar_mejor_atributo(df, atributos_disponibles)
+            self.traza.imprimir("Se expande el árbol")
+            nodo = SubconjuntoNodo(indices, self.datos.clases[indices], conteo_clases, histogramas,
+                                   atributos_descartados, profundidad, pesos)
+            atributos_candidatos = self._sortear_atributos(atributos_disponibles, atributos_descartados, generador)
+            with self.perfil.medir('busqueda_division', profundidad):
+                mejor_atributo = self.funcion_impureza.encontrar_mejor_atributo(self.datos, nodo,
+                                                                                atributos_candidatos)
+            atributos_descartados = self._actualizar_cache(nodo)
 
             if mejor_atributo.ganancia < self.umbral_ganancia:
-                print(
+                self.traza.imprimir(
                     "El atributo '" + mejor_atributo.nombre + "' no reduce significativamente la impureza")
-                print("Se crea un nodo hoja con clase: " + str(clase_mas_comun))
-                return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun)
+                self.traza.imprimir("Se crea un nodo hoja con clase:", clase_mas_comun)
+                self.traza.registrar('hoja', profundidad, len(indices), atributo=mejor_atributo.nombre,
+                                     ganancia=mejor_atributo.ganancia, umbral=mejor_atributo.umbral,
+                                     clase=clase_mas_comun, motivo=MOTIVOS_HOJA.ganancia_insuficiente)
+                self.perfil.registrar_hoja(MOTIVOS_HOJA.ganancia_insuficiente, profundidad)
+                return Nodo(valor=clase_mas_comun, clase_mas_comun=clase_mas_comun, conteo_clases=conteo_clases)
 
             # Crear un nodo de decisión y construir los hijos
             nuevos_atributos_disponibles: list[str] = atributos_disponibles.copy()
             nodos_hijos: dict[str, Nodo] = {}
+            valores = self.datos.columnas[mejor_atributo.nombre][indices]
 
-            print(f"Mejor atributo para dividir: '{mejor_atributo.nombre}' (Ganancia={mejor_atributo.ganancia:.4f})")
+            self.traza.imprimir(f"Mejor atributo para dividir: '{mejor_atributo.nombre}' "
+                                f"(Ganancia={mejor_atributo.ganancia:.4f})")
+            self.traza.registrar('division', profundidad, len(indices), atributo=mejor_atributo.nombre,
+                                 ganancia=mejor_atributo.ganancia, umbral=mejor_atributo.umbral)
             if mejor_atributo.es_categorico():
                 # Los atributos categóricos se pueden usar una sola vez en una rama
                 # Los atributos continuos pueden volver a usarse en sub-ramas con otros umbrales
                 nuevos_atributos_disponibles.remove(mejor_atributo.nombre)
+                categorias = self.datos.codificacion.categorias[mejor_atributo.nombre]
+
+                # Se divide el segmento por cada valor del mejor atributo (en el orden de sus códigos).
+                # Las instancias sin valor (código -1) quedan fuera de todas las ramas (o, con pesos, en todas).
+                ramas = np.where(valores >= 0, valores, len(categorias))
+                hijos = self._dividir_nodo(indices, pesos, ramas, len(categorias), mejor_atributo.conteos_ramas,
+                                           histogramas, profundidad)
 
-                print("Valores posibles del atributo: " + str(df[mejor_atributo.nombre].unique()))
-                # Se particiona el dataframe por cada valor único del mejor atributo seleccionado
-                for valor_atributo, df_valor_atributo in df.groupby(mejor_atributo.nombre):
-                    print(f"\n-- Subconjunto del dataframe para valor: {valor_atributo} --")
-                    print(df_valor_atributo)
-                    if len(df_valor_atributo) == 0:
+                generadores_hijos = self._generadores_hijos(generador, len(categorias))
+                if self.traza.es_detallada:
+                    self.traza.imprimir("Valores posibles del atributo:",
+                                        categorias[[len(hijo[0]) > 0 for hijo in hijos]])
+                for codigo in range(len(categorias)):
+                    indices_hijo, conteo_hijo, histogramas_hijo, pesos_hijo = hijos[codigo]
+                    if len(indices_hijo) == 0:
                         continue
+                    if self.traza.es_detallada:
+                        self.traza.imprimir("\n-- Subconjunto del dataframe para valor:", categorias[codigo], "--")
+                        self.traza.imprimir(self._df_entrenamiento.iloc[indices_hijo])
 
-                    nodos_hijos[str(valor_atributo)] = self._construir_arbol(df_valor_atributo,
-                                                                             nuevos_atributos_disponibles)
+                    nodos_hijos[str(categorias[codigo])] = self._construir_hijo(indices_hijo,
+                                                                                nuevos_atributos_disponibles,
+                                                                                conteo_hijo, profundidad + 1,
+                                                                                histogramas_hijo,
+                                                                                atributos_descartados,
+                                                                                generadores_hijos[codigo],
+                                                                                pesos_hijo)
 
-                return Nodo(atributo=mejor_atributo.nombre, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun)
+                return Nodo(atributo=mejor_atributo.nombre, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun,
+                            conteo_clases=conteo_clases, ganancia=mejor_atributo.ganancia)
             else:
-                print(f"Umbral de división: {mejor_atributo.umbral}")
-                # Dividir el conjunto en dos ramas: <= umbral y > umbral
-                df_menor_igual = df[df[mejor_atributo.nombre] <= mejor_atributo.umbral]
-                df_mayor = df[df[mejor_atributo.nombre] > mejor_atributo.umbral]
+                self.traza.imprimir("Umbral de división:", mejor_atributo.umbral)
+                # Dividir el segmento en dos ramas: <= umbral y > umbral (los valores faltantes quedan fuera o,
+                # con pesos, en las dos ramas)
+                ramas = np.where(valores <= mejor_atributo.umbral, 0, np.where(valores > mejor_atributo.umbral, 1, 2))
+                hijos = self._dividir_nodo(indices, pesos, ramas, 2, mejor_atributo.conteos_ramas, histogramas,
+                                           profundidad)
 
-                print(f"\n-- Subconjunto del dataframe para <= {mejor_atributo.umbral}: --")
-                print(df_menor_igual)
-                print(f"\n-- Subconjunto del dataframe para < {mejor_atributo.umbral}: --")
-                print(df_mayor)
+                generadores_hijos = self._generadores_hijos(generador, 2)
+                if self.traza.es_detallada:
+                    self.traza.imprimir("\n-- Subconjunto del dataframe para <=", mejor_atributo.umbral, "--")
+                    self.traza.imprimir(self._df_entrenamiento.iloc[hijos[0][0]])
+                    self.traza.imprimir("\n-- Subconjunto del dataframe para >", mejor_atributo.umbral, "--")
+                    self.traza.imprimir(self._df_entrenamiento.iloc[hijos[1][0]])
 
-                nodos_hijos['<= ' + str(mejor_atributo.umbral)] = self._construir_arbol(df_menor_igual,
-                                                                                        nuevos_atributos_disponibles)
-                nodos_hijos['> ' + str(mejor_atributo.umbral)] = self._construir_arbol(df_mayor,
-                                                                                       nuevos_atributos_disponibles)
+                for rama, condicion in enumerate(('<= ', '> ')):
+                    indices_hijo, conteo_hijo, histogramas_hijo, pesos_hijo = hijos[rama]
+                    nodos_hijos[condicion + str(mejor_atributo.umbral)] = self._construir_hijo(
+                        indices_hijo, nuevos_atributos_disponibles, conteo_hijo, profundidad + 1, histogramas_hijo,
+                        atributos_descartados, generadores_hijos[rama], pesos_hijo)
 
                 return Nodo(atributo=mejor_atributo.nombre, nodos_hijos=nodos_hijos, clase_mas_comun=clase_mas_comun,
-                            umbral=mejor_atributo.umbral)
+                            umbral=mejor_atributo.umbral, conteo_clases=conteo_clases,
+                            ganancia=mejor_atributo.ganancia)
+
+    # Construye el subárbol de un hijo. En modo paralelo, los hijos con suficientes instancias se encolan como
+    # tareas y en su lugar se devuelve un Future; cada tarea trabaja sobre su propio segmento del arreglo de
+    # índices y nunca espera a otra tarea, por lo que los hilos libres siempre pueden tomar trabajo pendiente.
+    def _construir_hijo(self, indices: np.ndarray, atributos_disponibles: list[str], conteo_clases: np.ndarray,
+                        profundidad: int, histogramas: dict[str, np.ndarray] | None,
+                        atributos_descartados: frozenset[str], generador: np.random.Generator | None,
+                        pesos: np.ndarray | None) -> Nodo | Future:
+        if self._ejecutor_subarboles is not None and len(indices) >= self.min_instancias_subarbol:
+            return self._ejecutor_subarboles.submit(self._construir_arbol, indices, atributos_disponibles,
+                                                    conteo_clases, profundidad, histogramas, atributos_descartados,
+                                                    generador, pesos)
+        return self._construir_arbol(indices, atributos_disponibles, conteo_clases, profundidad, histogramas,
+                                     atributos_descartados, generador, pesos)
+
+    # Divide las instancias del nodo según 'ramas' (la rama de cada instancia; cant_ramas si le falta el valor).
+    # Devuelve, por rama, los índices, el conteo de clases, los histogramas y los pesos de sus instancias.
+    # Sin pesos, el segmento se particiona en el lugar y los conteos de cada rama son los de la división.
+    # Con pesos, cada rama recibe arreglos nuevos con sus instancias y todas las instancias sin valor, cuyo peso
+    # se multiplica por la fracción del peso con valor que tiene la rama. Una rama sin instancias con valor
+    # queda vacía.
+    def _dividir_nodo(self, indices: np.ndarray, pesos: np.ndarray | None, ramas: np.ndarray, cant_ramas: int,
+                      conteos_ramas: np.ndarray, histogramas: dict[str, np.ndarray] | None,
+                      profundidad: int) -> list[tuple]:
+        if pesos is None:
+            with self.perfil.medir('particion', profundidad):
+                limites = particionar(indices, ramas, cant_ramas)
+            histogramas_hijos = self._calcular_histogramas_hijos(indices, limites, histogramas, profundidad)
+            return [(indices[limites[rama]:limites[rama + 1]], conteos_ramas[rama], histogramas_hijos[rama], None)
+                    for rama in range(cant_ramas)]
+
+        with self.perfil.medir('particion', profundidad):
+            ramas = np.minimum(ramas, cant_ramas)
+            orden = np.argsort(ramas, kind='stable')
+            indices_ordenados, pesos_ordenados = indices[orden], pesos[orden]
+            limites = np.searchsorted(ramas[orden], np.arange(cant_ramas + 1))
+            indices_faltantes, pesos_faltantes = indices_ordenados[limites[-1]:], pesos_ordenados[limites[-1]:]
+            peso_por_rama = conteos_ramas.sum(axis=1)
+            peso_conocido = peso_por_rama.sum()
+
+            hijos: list[tuple] = []
+            for rama in range(cant_ramas):
+                inicio, fin = limites[rama], limites[rama + 1]
+                if inicio == fin:
+                    hijos.append((indices_ordenados[inicio:fin], None, None, None))
+                    continue
+                indices_hijo = np.concatenate((indices_ordenados[inicio:fin], indices_faltantes))
+                pesos_hijo = np.concatenate((pesos_ordenados[inicio:fin],
+                                             pesos_faltantes * (peso_por_rama[rama] / peso_conocido)))
+                conteo_hijo = np.bincount(self.datos.clases[indices_hijo], weights=pesos_hijo,
+                                          minlength=self.datos.cant_clases)
+                hijos.append((indices_hijo, conteo_hijo, None, pesos_hijo))
+
+        if histogramas is not None:
+            # Las instancias sin valor están en más de una rama: los histogramas no se obtienen por diferencia
+            with self.perfil.medir('histogramas', profundidad + 1):
+                for rama, (indices_hijo, conteo_hijo, _, pesos_hijo) in enumerate(hijos):
+                    if conteo_hijo is not None:
+                        hijos[rama] = (indices_hijo, conteo_hijo,
+                                       calcular_histogramas(self.datos, indices_hijo, pesos_hijo), pesos_hijo)
+        return hijos
+
+    # Con max_atributos, devuelve a lo sumo max_atributos atributos sorteados entre los disponibles que no están
+    # descartados, en el orden de atributos_disponibles para que el desempate no dependa del sorteo
+    def _sortear_atributos(self, atributos_disponibles: list[str], atributos_descartados: frozenset[str],
+                           generador: np.random.Generator | None) -> list[str]:
+        if generador is None:
+            return atributos_disponibles
+        candidatos = [nombre for nombre in atributos_disponibles if nombre not in atributos_descartados]
+        if len(candidatos) <= self.max_atributos:
+            return atributos_disponibles
+        elegidos = np.sort(generador.choice(len(candidatos), size=self.max_atributos, replace=False))
+        return [candidatos[posicion] for posicion in elegidos]
 
-    def _tiene_una_sola_clase(self, columna_clases: Series) -> bool:
-        return columna_clases.nunique() == 1
+    # Cada hijo sortea con su propio generador, derivado del padre antes de construirlos: el resultado no
+    # depende del orden en que los hilos construyen los subárboles
+    @staticmethod
+    def _generadores_hijos(generador: np.random.Generator | None, cant_hijos: int) -> list:
+        if generador is None:
+            return [None] * cant_hijos
+        return generador.spawn(cant_hijos)
+
+    # Suma las evaluaciones del nodo a las estadísticas y devuelve los atributos que se descartan en sus hijos
+    def _actualizar_cache(self, nodo: SubconjuntoNodo) -> frozenset[str]:
+        with self._bloqueo_estadisticas:
+            self.estadisticas_cache['aciertos'] += nodo.cant_omitidos
+            self.estadisticas_cache['fallos'] += nodo.cant_evaluados
+        if not self.cache_atributos or self.umbral_ganancia <= 0 or not nodo.atributos_sin_division:
+            return nodo.atributos_descartados
+        return nodo.atributos_descartados.union(nodo.atributos_sin_division)
+
+    # Histogramas de cada hijo a partir de los del padre (uno por rama; todos None si no se usan histogramas)
+    def _calcular_histogramas_hijos(self, indices: np.ndarray, limites: np.ndarray,
+                                    histogramas: dict[str, np.ndarray] | None, profundidad: int) -> list:
+        if histogramas is None:
+            return [None] * (len(limites) - 1)
+        with self.perfil.medir('histogramas', profundidad + 1):
+            return calcular_histogramas_hijos(self.datos, indices, limites, histogramas)
+
+    # Reemplaza los subárboles encolados por los nodos construidos. Las claves de nodos_hijos se crean
+    # en el mismo orden que en la construcción secuencial, por lo que el árbol resultante es idéntico.
+    def _resolver_subarboles(self, raiz_arbol: Nodo) -> Nodo:
+        nodos_pendientes: list[Nodo] = [raiz_arbol]
+        while nodos_pendientes:
+            nodo = nodos_pendientes.pop()
+            for condicion, nodo_hijo in list(nodo.nodos_hijos.items()):
+                if isinstance(nodo_hijo, Future):
+                    nodo_hijo = nodo_hijo.result()
+                    nodo.nodos_hijos[condicion] = nodo_hijo
+                nodos_pendientes.append(nodo_hijo)
+        return raiz_arbol
+
+    def _tiene_una_sola_clase(self, conteo_clases: np.ndarray) -> bool:
+        return np.count_nonzero(conteo_clases) == 1
 
     def _hay_atributos_disponibles(self, atributos_disponibles: list[str]) -> bool:
         return len(atributos_disponibles) > 0
 
+    # Aplana el árbol entrenado en arreglos de NumPy (ver ArbolCompilado), que son los que se usan para predecir
+    def compilar(self) -> ArbolCompilado:
+        if self.raiz_arbol is None:
+            raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder compilarlo.")
+        self.arbol_compilado = compilar_arbol(self.raiz_arbol, self.codificacion,
+                                              self.valores_faltantes == VALORES_FALTANTES.fraccionar)
+        return self.arbol_compilado
+
+    # Poda el árbol entrenado con la poda por error pesimista de C4.5 (ver podar_arbol) y lo vuelve a compilar.
+    # Un factor_confianza menor poda más. Devuelve la cantidad de nodos y la profundidad antes y después de podar.
+    def podar(self, factor_confianza: float = FACTOR_CONFIANZA) -> dict[str, int]:
+        if self.raiz_arbol is None:
+            raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder podarlo.")
+        if not 0 < factor_confianza < 1:
+            raise RuntimeError("El factor de confianza debe estar entre 0 y 1.")
+
+        reporte = {'nodos_antes': contar_nodos(self.raiz_arbol),
+                   'profundidad_antes': calcular_profundidad(self.raiz_arbol)}
+        self.raiz_arbol = podar_arbol(self.raiz_arbol, factor_confianza)
+        self.compilar()
+        reporte['nodos_despues'] = contar_nodos(self.raiz_arbol)
+        reporte['profundidad_despues'] = calcular_profundidad(self.raiz_arbol)
+        return reporte
+
     # Predice la clase para una única instancia de datos.
     def predecir(self, instancia: dict):
         # Validaciones previas
-        lista_atributos = self._obtener_lista_atributos()
-        if self.raiz_arbol is None:
+        if self.arbol_compilado is None:
             raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder predecir.")
-        elif len(instancia.keys()) != len(lista_atributos):
+        lista_atributos = self.codificacion.atributos
+        if len(instancia.keys()) != len(lista_atributos):
             raise RuntimeError("Los atributos de la instancia no coinciden con los del árbol.")
         for atributo in instancia.keys():
             if atributo not in lista_atributos:
                 raise RuntimeError("El atributo '" + atributo + "' no es válido")
 
-        # Prediccion
-        nodo_actual = self.raiz_arbol
-        while not nodo_actual.es_nodo_hoja():
-            # Obtener el atributo y el valor de la instancia para el nodo actual
-            atributo_decision = nodo_actual.atributo
-            valor_instancia = instancia[atributo_decision]
-
-            # Lógica para decidir la siguiente rama
-            es_atributo_categorico = nodo_actual.umbral is None
-            if es_atributo_categorico:
-                # Si el valor de la instancia existe como una rama en el árbol
-                if valor_instancia in nodo_actual.nodos_hijos:
-                    nodo_actual = nodo_actual.nodos_hijos[valor_instancia]
-                else:
-                    # Caso de respaldo:
-                    # Si el valor no se vio durante el entrenamiento en esta rama, predice la clase más común de este nodo.
-                    return nodo_actual.clase_mas_comun
-            else:
-                if valor_instancia <= nodo_actual.umbral:
-                    # La clave para la rama "menor o igual"
-                    llave_hijo = f"<= {nodo_actual.umbral}"
-                else:
-                    # La clave para la rama "mayor que"
-                    llave_hijo = f"> {nodo_actual.umbral}"
+        return self.arbol_compilado.predecir(instancia)
 
-                nodo_actual = nodo_actual.nodos_hijos[llave_hijo]
+    # Predice la clase de todas las instancias de un DataFrame (o matriz de NumPy) de una sola vez.
+    # Con devolver_distribucion=True también devuelve la distribución de clases del nodo alcanzado por cada fila.
+    def predecir_lote(self, instancias: DataFrame | np.ndarray,
+                      devolver_distribucion: bool = False) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        if self.arbol_compilado is None:
+            raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder predecir.")
+        return self.arbol_compilado.predecir_lote(instancias, devolver_distribucion)
 
-        # Cuando se llega a un nodo hoja, se retorna su valor como predicción
-        return nodo_actual.valor
+    # Predice la clase de todas las instancias de datos ya codificados (ver cache_datasets.cargar_csv_codificado)
+    # sin volver a construir un DataFrame
+    def predecir_codificado(self, datos: DatosCodificados) -> np.ndarray:
+        if self.arbol_compilado is None:
+            raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder predecir.")
+        compilado = self.arbol_compilado
+        codigos = compilado.predecir_codigos(compilado.columnas_desde_codificados(datos), datos.cant_instancias)
+        return compilado.codificacion.etiquetas_clases[codigos]
 
     ## Representación visual del árbol generado
     def imprimir_arbol(self, indent: str = "") -> None:
@@ -0,0 +1,220 @@
+import itertools
+
+import numpy as np
+from pandas import DataFrame
+
+from arbol_decision.algoritmo import C45
+from arbol_decision.nodo import Nodo as NodoC45
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+from mi_arbol_decision.nodo import Nodo
+
+# Barridos de hiperparámetros de parada sin reentrenar. Un árbol construido con un criterio de parada más permisivo
+# contiene, como prefijo, a todos los árboles construidos con criterios más estrictos: la búsqueda de la división
+# de un nodo no depende del criterio de parada, solo la decisión de expandirlo. Por eso se construye una única vez
+# el árbol más permisivo de la grilla y el árbol de cada combinación se obtiene cortándolo.
+
+
+class ResultadoBarrido:
+    def __init__(self, parametros: dict, exactitud: float, cant_nodos: int, profundidad: int):
+        # Valores de los hiperparámetros de la combinación
+        self.parametros: dict = parametros
+        # Proporción de filas de validación bien clasificadas por el árbol cortado
+        self.exactitud: float = exactitud
+        self.cant_nodos: int = cant_nodos
+        self.profundidad: int = profundidad
+
+    def __repr__(self):
+        return (f"ResultadoBarrido(parametros={self.parametros}, exactitud={self.exactitud:.4f}, "
+                f"cant_nodos={self.cant_nodos}, profundidad={self.profundidad})")
+
+
+# Barrido de umbral_ganancia para ArbolDecision: un nodo del árbol completo se convierte en hoja con un umbral
+# mayor que la ganancia de su división. 'parametros' son el resto de los parámetros del árbol.
+class BarridoArbolDecision:
+    def __init__(self, umbrales_ganancia: list[float], **parametros):
+        if not umbrales_ganancia:
+            raise RuntimeError("El barrido necesita al menos un valor de umbral_ganancia.")
+        self.umbrales_ganancia: list[float] = sorted(umbrales_ganancia)
+        self.parametros: dict = parametros
+        self.arbol_completo: ArbolDecision | None = None
+        # Profundidad de cada nodo del árbol compilado y menor ganancia entre sus ancestros (infinito en la raíz):
+        # un nodo forma parte del árbol cortado con un umbral si ese umbral no supera la ganancia de sus ancestros
+        self._profundidad: np.ndarray | None = None
+        self._ganancia_ancestros: np.ndarray | None = None
+
+    def entrenar(self, df: DataFrame, nombre_objetivo: str) -> None:
+        self.arbol_completo = ArbolDecision(umbral_ganancia=self.umbrales_ganancia[0], **self.parametros)
+        self.arbol_completo.entrenar(df, nombre_objetivo)
+
+        compilado = self.arbol_completo.arbol_compilado
+        self._profundidad = np.zeros(compilado.cant_nodos, dtype=np.int64)
+        self._ganancia_ancestros = np.full(compilado.cant_nodos, np.inf)
+        # Los nodos están en preorden: cada padre se recorre antes que sus hijos
+        for numero in np.flatnonzero(compilado.atributo >= 0).tolist():
+            hijos = compilado.hijos[compilado.inicio_hijos[numero]:compilado.inicio_hijos[numero]
+                                    + self._cant_ramas(numero)]
+            hijos = hijos[hijos >= 0]
+            self._profundidad[hijos] = self._profundidad[numero] + 1
+            self._ganancia_ancestros[hijos] = min(self._ganancia_ancestros[numero], compilado.ganancia[numero])
+
+    # Evalúa sobre el conjunto de validación el árbol de cada umbral de la grilla
+    def evaluar(self, df_validacion: DataFrame) -> list[ResultadoBarrido]:
+        if self.arbol_completo is None:
+            raise RuntimeError("El barrido debe ser entrenado antes de poder evaluarlo.")
+        compilado = self.arbol_completo.arbol_compilado
+        columnas = compilado.codificar_columnas(df_validacion)
+        reales = df_validacion[self.arbol_completo.nombre_objetivo].to_numpy()
+
+        resultados = []
+        for umbral_ganancia in self.umbrales_ganancia:
+            codigos = compilado.predecir_codigos(columnas, len(df_validacion), compilado.ganancia < umbral_ganancia)
+            predicciones = compilado.codificacion.etiquetas_clases[codigos]
+            incluidos = self._ganancia_ancestros >= umbral_ganancia
+            resultados.append(ResultadoBarrido({'umbral_ganancia': umbral_ganancia},
+                                               float(np.mean(predicciones == reales)), int(incluidos.sum()),
+                                               int(self._profundidad[incluidos].max())))
+        return resultados
+
+    # Devuelve el árbol que se obtendría al entrenar con umbral_ganancia (sin volver a entrenar)
+    def arbol(self, umbral_ganancia: float) -> ArbolDecision:
+        if self.arbol_completo is None:
+            raise RuntimeError("El barrido debe ser entrenado antes de poder obtener un árbol.")
+        arbol = ArbolDecision(umbral_ganancia=umbral_ganancia, **self.parametros)
+        arbol.nombre_objetivo = self.arbol_completo.nombre_objetivo
+        arbol.codificacion = self.arbol_completo.codificacion
+        arbol.raiz_arbol = _cortar_nodo(self.arbol_completo.raiz_arbol, umbral_ganancia)
+        arbol.compilar()
+        return arbol
+
+    def _cant_ramas(self, numero: int) -> int:
+        compilado = self.arbol_completo.arbol_compilado
+        nombre_atributo = compilado.codificacion.atributos[compilado.atributo[numero]]
+        if compilado.codificacion.es_continuo(nombre_atributo):
+            return 2
+        return len(compilado.codificacion.categorias[nombre_atributo])
+
+
+def _cortar_nodo(nodo: Nodo, umbral_ganancia: float) -> Nodo:
+    if nodo.es_nodo_hoja():
+        return nodo
+    if nodo.ganancia < umbral_ganancia:
+        return Nodo(valor=nodo.clase_mas_comun, clase_mas_comun=nodo.clase_mas_comun,
+                    conteo_clases=nodo.conteo_clases)
+    nodos_hijos = {condicion: _cortar_nodo(nodo_hijo, umbral_ganancia)
+                   for condicion, nodo_hijo in nodo.nodos_hijos.items()}
+    return Nodo(atributo=nodo.atributo, nodos_hijos=nodos_hijos, clase_mas_comun=nodo.clase_mas_comun,
+                umbral=nodo.umbral, conteo_clases=nodo.conteo_clases, ganancia=nodo.ganancia)
+
+
+# Barrido de max_depth y min_samples_split para el C4.5 binario de arbol_decision: un nodo del árbol completo se
+# convierte en hoja si su profundidad alcanza max_depth o si le llegan menos de min_samples_split muestras.
+class BarridoC45:
+    def __init__(self, max_depths: list[int], min_samples_splits: list[int]):
+        if not max_depths or not min_samples_splits:
+            raise RuntimeError("El barrido necesita al menos un valor de max_depth y de min_samples_split.")
+        self.max_depths: list[int] = sorted(max_depths)
+        self.min_samples_splits: list[int] = sorted(min_samples_splits)
+        self.arbol_completo: C45 | None = None
+        # Arreglos paralelos con una posición por nodo del árbol completo (en preorden; el nodo 0 es la raíz)
+        self._nodos: list[NodoC45] = []
+        self._feature: np.ndarray | None = None
+        self._threshold: np.ndarray | None = None
+        self._left: np.ndarray | None = None
+        self._right: np.ndarray | None = None
+        self._profundidad: np.ndarray | None = None
+        self._n_samples: np.ndarray | None = None
+        self._clase: np.ndarray | None = None
+        self._es_hoja: np.ndarray | None = None
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> None:
+        self.arbol_completo = C45(max_depth=self.max_depths[-1], min_samples_split=self.min_samples_splits[0])
+        self.arbol_completo.fit(X, y)
+
+        nodos: list[NodoC45] = []
+        profundidades: list[int] = []
+        pendientes = [(self.arbol_completo.root, 0)]
+        while pendientes:
+            nodo, profundidad = pendientes.pop()
+            nodos.append(nodo)
+            profundidades.append(profundidad)
+            if not nodo.es_nodo_hoja():
+                pendientes.append((nodo.right, profundidad + 1))
+                pendientes.append((nodo.left, profundidad + 1))
+        numero_nodo = {id(nodo): numero for numero, nodo in enumerate(nodos)}
+
+        self._nodos = nodos
+        self._es_hoja = np.array([nodo.es_nodo_hoja() for nodo in nodos])
+        self._feature = np.array([-1 if nodo.es_nodo_hoja() else nodo.feature for nodo in nodos], dtype=np.int64)
+        self._threshold = np.array([np.nan if nodo.es_nodo_hoja() else nodo.threshold for nodo in nodos],
+                                   dtype=np.float64)
+        self._left = np.array([-1 if nodo.es_nodo_hoja() else numero_nodo[id(nodo.left)] for nodo in nodos],
+                              dtype=np.int64)
+        self._right = np.array([-1 if nodo.es_nodo_hoja() else numero_nodo[id(nodo.right)] for nodo in nodos],
+                               dtype=np.int64)
+        self._profundidad = np.array(profundidades, dtype=np.int64)
+        self._n_samples = np.array([nodo.n_samples for nodo in nodos], dtype=np.int64)
+        self._clase = np.array([nodo.most_common_class for nodo in nodos])
+
+    # Evalúa sobre el conjunto de validación el árbol de cada combinación de max_depth y min_samples_split
+    def evaluar(self, X_validacion: np.ndarray, y_validacion: np.ndarray) -> list[ResultadoBarrido]:
+        if self.arbol_completo is None:
+            raise RuntimeError("El barrido debe ser entrenado antes de poder evaluarlo.")
+        X_validacion = np.asarray(X_validacion)
+        resultados = []
+        for max_depth, min_samples_split in itertools.product(self.max_depths, self.min_samples_splits):
+            cortados = self._cortados(max_depth, min_samples_split)
+            nodo_final = self._recorrer(X_validacion, cortados)
+            predicciones = self._clase[nodo_final]
+            incluidos = self._incluidos(cortados)
+            resultados.append(ResultadoBarrido({'max_depth': max_depth, 'min_samples_split': min_samples_split},
+                                               float(np.mean(predicciones == y_validacion)), int(incluidos.sum()),
+                                               int(self._profundidad[incluidos].max())))
+        return resultados
+
+    # Devuelve el árbol que se obtendría al entrenar con max_depth y min_samples_split (sin volver a entrenar)
+    def arbol(self, max_depth: int, min_samples_split: int) -> C45:
+        if self.arbol_completo is None:
+            raise RuntimeError("El barrido debe ser entrenado antes de poder obtener un árbol.")
+        cortados = self._cortados(max_depth, min_samples_split)
+        arbol = C45(min_samples_split=min_samples_split, max_depth=max_depth)
+        arbol._tipo_clases = self.arbol_completo._tipo_clases
+        arbol.root = self._cortar_nodo(0, cortados)
+        return arbol
+
+    # Nodos donde se detiene la construcción con la combinación: las hojas del árbol completo y los nodos que
+    # cumplen el criterio de parada
+    def _cortados(self, max_depth: int, min_samples_split: int) -> np.ndarray:
+        return self._es_hoja | (self._profundidad >= max_depth) | (self._n_samples < min_samples_split)
+
+    # Nodos que forman parte del árbol cortado: aquellos cuyo padre no está cortado
+    def _incluidos(self, cortados: np.ndarray) -> np.ndarray:
+        incluidos = np.zeros(len(self._nodos), dtype=bool)
+        incluidos[0] = True
+        # Los nodos están en preorden: cada padre se recorre antes que sus hijos
+        for numero in np.flatnonzero(~self._es_hoja).tolist():
+            if incluidos[numero] and not cortados[numero]:
+                incluidos[self._left[numero]] = True
+                incluidos[self._right[numero]] = True
+        return incluidos
+
+    # Baja las filas por el árbol completo, de a un nivel por vez, hasta llegar a un nodo cortado
+    def _recorrer(self, X: np.ndarray, cortados: np.ndarray) -> np.ndarray:
+        nodo_final = np.zeros(len(X), dtype=np.int64)
+        filas = np.arange(len(X))
+        nodos = np.zeros(len(X), dtype=np.int64)
+        while len(filas) > 0:
+            se_detiene = cortados[nodos]
+            nodo_final[filas[se_detiene]] = nodos[se_detiene]
+            filas, nodos = filas[~se_detiene], nodos[~se_detiene]
+            va_izquierda = X[filas, self._feature[nodos]] <= self._threshold[nodos]
+            nodos = np.where(va_izquierda, self._left[nodos], self._right[nodos])
+        return nodo_final
+
+    def _cortar_nodo(self, numero: int, cortados: np.ndarray) -> NodoC45:
+        nodo = self._nodos[numero]
+        if cortados[numero]:
+            return NodoC45(value=nodo.most_common_class, n_samples=nodo.n_samples,
+                           most_common_class=nodo.most_common_class)
+        return NodoC45(nodo.feature, nodo.threshold, self._cortar_nodo(self._left[numero], cortados),
+                       self._cortar_nodo(self._right[numero], cortados), n_samples=nodo.n_samples,
+                       most_common_class=nodo.most_common_class)
@@ -0,0 +1,122 @@
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pandas import DataFrame
+
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+from mi_arbol_decision.compilado import ArbolCompilado
+from mi_arbol_decision.datos import (Codificacion, DatosCodificados, abrir_datos_codificados, codificar_dataframe,
+                                     guardar_datos_codificados)
+
+# Datos codificados de entrenamiento en cada proceso del bosque (los asigna _inicializar_proceso)
+_datos_proceso: DatosCodificados | None = None
+
+
+# Bosque aleatorio: conjunto de árboles de decisión entrenados cada uno sobre una muestra bootstrap de las filas y
+# eligiendo la división de cada nodo entre max_atributos atributos sorteados. Predice por votación de los árboles.
+class BosqueAleatorio:
+    def __init__(self, n_arboles: int = 100, max_atributos: int | None = None, umbral_ganancia: float = 0.001,
+                 funcion_impureza: str = '', max_bins: int | None = None, n_jobs: int = 1,
+                 semilla: int | None = None):
+        self.n_arboles: int = n_arboles
+        # Atributos sorteados en cada nodo; None usa la raíz cuadrada de la cantidad de atributos
+        self.max_atributos: int | None = max_atributos
+        # Parámetros de cada árbol (ver ArbolDecision)
+        self.umbral_ganancia: float = umbral_ganancia
+        self.funcion_impureza: str = funcion_impureza
+        self.max_bins: int | None = max_bins
+        # Cantidad de procesos para entrenar árboles en paralelo (-1 usa todos los núcleos)
+        self.n_jobs: int = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        # Semilla de las muestras bootstrap y de los sorteos de atributos: con la misma semilla se obtiene el
+        # mismo bosque, sin importar la cantidad de procesos
+        self.semilla: int | None = semilla
+        self.nombre_objetivo: str = ''
+        self.codificacion: Codificacion | None = None
+        self.arboles: list[ArbolCompilado] = []
+
+    # Codifica el DataFrame una única vez y entrena los árboles. Con más de un proceso, las columnas codificadas
+    # se guardan en archivos temporales que cada proceso abre con np.memmap en modo de solo lectura: el sistema
+    # operativo comparte sus páginas entre los procesos y los datos no se copian a cada tarea.
+    def entrenar(self, df: DataFrame, nombre_objetivo: str) -> None:
+        if self.n_arboles < 1:
+            raise RuntimeError("El bosque debe tener al menos un árbol.")
+        if self.max_atributos is not None and self.max_atributos < 1:
+            raise RuntimeError("max_atributos debe ser al menos 1.")
+
+        datos = codificar_dataframe(df, nombre_objetivo)
+        self.nombre_objetivo = nombre_objetivo
+        self.codificacion = datos.codificacion
+        parametros = {
+            'umbral_ganancia': self.umbral_ganancia,
+            'funcion_impureza': self.funcion_impureza,
+            'max_bins': self.max_bins,
+            'max_atributos': self.max_atributos or max(1, math.isqrt(len(self.codificacion.atributos))),
+        }
+        # Una semilla independiente por árbol, derivada de la semilla del bosque
+        semillas = np.random.SeedSequence(self.semilla).spawn(self.n_arboles)
+
+        if self.n_jobs == 1 or self.n_arboles == 1:
+            arboles = [_entrenar_arbol(datos, nombre_objetivo, parametros, semilla) for semilla in semillas]
+        else:
+            with tempfile.TemporaryDirectory() as directorio:
+                guardar_datos_codificados(datos, directorio)
+                with ProcessPoolExecutor(max_workers=min(self.n_jobs, self.n_arboles),
+                                         initializer=_inicializar_proceso,
+                                         initargs=(directorio, datos.codificacion)) as ejecutor:
+                    arboles = list(ejecutor.map(_entrenar_arbol_proceso, [nombre_objetivo] * self.n_arboles,
+                                                [parametros] * self.n_arboles, semillas))
+
+        # Todos los árboles comparten la codificación del bosque
+        for arbol in arboles:
+            arbol.codificacion = self.codificacion
+        self.arboles = arboles
+
+    # Predice la clase de una única instancia (diccionario atributo -> valor)
+    def predecir(self, instancia: dict):
+        return self.predecir_lote(DataFrame([instancia]))[0]
+
+    # Predice la clase de todas las filas de un DataFrame (o matriz de NumPy) por mayoría de votos. Las columnas
+    # se codifican una sola vez para todos los árboles y los votos se suman con operaciones vectorizadas.
+    # Con devolver_distribucion=True también devuelve, por fila, la proporción de votos de cada clase.
+    def predecir_lote(self, instancias: DataFrame | np.ndarray,
+                      devolver_distribucion: bool = False) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        if not self.arboles:
+            raise RuntimeError("El bosque debe ser entrenado antes de poder predecir.")
+        if isinstance(instancias, np.ndarray):
+            instancias = DataFrame(instancias, columns=self.codificacion.atributos)
+
+        cant_instancias = len(instancias)
+        columnas = self.arboles[0].codificar_columnas(instancias, todos_los_atributos=True)
+        votos = np.zeros((cant_instancias, self.codificacion.cant_clases), dtype=np.int64)
+        filas = np.arange(cant_instancias)
+        for arbol in self.arboles:
+            votos[filas, arbol.predecir_codigos(columnas, cant_instancias)] += 1
+
+        # Ante empates se elige la clase de menor código, igual que en los nodos hoja
+        predicciones = self.codificacion.etiquetas_clases[np.argmax(votos, axis=1)]
+        if not devolver_distribucion:
+            return predicciones
+        return predicciones, votos / len(self.arboles)
+
+
+# Entrena un árbol sobre una muestra bootstrap (con reposición, del mismo tamaño que los datos)
+def _entrenar_arbol(datos: DatosCodificados, nombre_objetivo: str, parametros: dict,
+                    semilla: np.random.SeedSequence) -> ArbolCompilado:
+    generador = np.random.default_rng(semilla)
+    indices = generador.integers(0, datos.cant_instancias, size=datos.cant_instancias)
+    arbol = ArbolDecision(**parametros, semilla=int(generador.integers(2 ** 63)))
+    arbol.entrenar_codificado(datos, nombre_objetivo, indices)
+    return arbol.arbol_compilado
+
+
+def _entrenar_arbol_proceso(nombre_objetivo: str, parametros: dict,
+                            semilla: np.random.SeedSequence) -> ArbolCompilado:
+    return _entrenar_arbol(_datos_proceso, nombre_objetivo, parametros, semilla)
+
+
+def _inicializar_proceso(directorio: str, codificacion: Codificacion) -> None:
+    global _datos_proceso
+    _datos_proceso = abrir_datos_codificados(directorio, codificacion)
@@ -0,0 +1,124 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from mi_arbol_decision.datos import (Codificacion, DatosCodificados, abrir_datos_codificados, codificar_dataframe,
+                                     guardar_datos_codificados)
+
+# Formato del cache de un CSV: un directorio con una columna codificada por atributo (.npy, ver
+# guardar_datos_codificados) y un esquema JSON con la codificación y los datos del archivo de origen.
+# El esquema se escribe al final, por lo que un cache sin esquema está incompleto y se vuelve a generar.
+VERSION_CACHE = 1
+ARCHIVO_ESQUEMA = 'esquema.json'
+_TAMANO_BLOQUE_HASH = 1 << 20
+
+
+# Carga un CSV ya codificado. La primera vez lee el CSV, lo codifica y guarda el resultado en 'directorio_cache'
+# (por defecto, '<ruta_csv>.cache'); las siguientes abre las columnas guardadas con np.memmap en modo de solo
+# lectura, sin leer el CSV ni copiar los datos, de modo que sirven directamente para entrenar
+# (ArbolDecision.entrenar_codificado) y para predecir (ArbolDecision.predecir_codificado).
+# El cache se regenera si cambia el archivo de origen: si su tamaño y fecha de modificación coinciden con los del
+# esquema se considera vigente; si solo cambió la fecha, se compara el hash SHA-256 del contenido.
+def cargar_csv_codificado(ruta_csv: str, nombre_objetivo: str, directorio_cache: str | None = None,
+                          columnas_ignoradas: list[str] | None = None) -> DatosCodificados:
+    directorio_cache = directorio_cache or ruta_csv + '.cache'
+    columnas_ignoradas = sorted(columnas_ignoradas or [])
+
+    esquema = _leer_esquema(directorio_cache)
+    if esquema is not None and _cache_vigente(esquema, ruta_csv, nombre_objetivo, columnas_ignoradas,
+                                             directorio_cache):
+        return abrir_datos_codificados(directorio_cache, _codificacion_desde_esquema(esquema))
+
+    df = pd.read_csv(ruta_csv)
+    df = df.drop(columns=[columna for columna in columnas_ignoradas if columna in df.columns])
+    datos = codificar_dataframe(df, nombre_objetivo)
+    _guardar_cache(datos, ruta_csv, nombre_objetivo, columnas_ignoradas, directorio_cache)
+    return abrir_datos_codificados(directorio_cache, datos.codificacion)
+
+
+def _leer_esquema(directorio_cache: str) -> dict | None:
+    try:
+        with open(os.path.join(directorio_cache, ARCHIVO_ESQUEMA), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_vigente(esquema: dict, ruta_csv: str, nombre_objetivo: str, columnas_ignoradas: list[str],
+                   directorio_cache: str) -> bool:
+    if (esquema.get('version') != VERSION_CACHE or esquema['nombre_objetivo'] != nombre_objetivo
+            or esquema['columnas_ignoradas'] != columnas_ignoradas):
+        return False
+    estado = os.stat(ruta_csv)
+    origen = esquema['origen']
+    if estado.st_size != origen['tamano']:
+        return False
+    if estado.st_mtime_ns == origen['modificacion_ns']:
+        return True
+    if _calcular_hash(ruta_csv) != origen['sha256']:
+        return False
+
+    # El contenido no cambió (por ejemplo, el archivo se copió): se actualiza la fecha para no volver a calcular
+    # el hash en la próxima carga
+    origen['modificacion_ns'] = estado.st_mtime_ns
+    _escribir_esquema(esquema, directorio_cache)
+    return True
+
+
+def _guardar_cache(datos: DatosCodificados, ruta_csv: str, nombre_objetivo: str, columnas_ignoradas: list[str],
+                   directorio_cache: str) -> None:
+    _borrar_cache(directorio_cache)
+    os.makedirs(directorio_cache, exist_ok=True)
+    guardar_datos_codificados(datos, directorio_cache)
+
+    estado = os.stat(ruta_csv)
+    codificacion = datos.codificacion
+    _escribir_esquema({
+        'version': VERSION_CACHE,
+        'nombre_objetivo': nombre_objetivo,
+        'columnas_ignoradas': columnas_ignoradas,
+        'origen': {'ruta': os.path.abspath(ruta_csv), 'tamano': estado.st_size,
+                   'modificacion_ns': estado.st_mtime_ns, 'sha256': _calcular_hash(ruta_csv)},
+        'cant_instancias': datos.cant_instancias,
+        'atributos': codificacion.atributos,
+        'categorias': {nombre: categorias.tolist() for nombre, categorias in codificacion.categorias.items()},
+        'etiquetas_clases': codificacion.etiquetas_clases.tolist(),
+    }, directorio_cache)
+
+
+# Descarta el cache anterior, empezando por su esquema (que es lo que lo marca como completo). Solo se borran los
+# archivos que escribe este módulo: el directorio puede indicarlo quien llama y contener otros archivos.
+def _borrar_cache(directorio_cache: str) -> None:
+    archivos = [os.path.join(directorio_cache, nombre)
+                for nombre in (ARCHIVO_ESQUEMA, ARCHIVO_ESQUEMA + '.tmp', 'clases.npy')]
+    archivos += glob.glob(os.path.join(glob.escape(directorio_cache), 'atributo_*.npy'))
+    for ruta in archivos:
+        if os.path.isfile(ruta):
+            os.remove(ruta)
+
+
+# Escribe el esquema en un archivo temporal y lo reemplaza de una vez, para que nunca quede un esquema a medias
+def _escribir_esquema(esquema: dict, directorio_cache: str) -> None:
+    ruta_temporal = os.path.join(directorio_cache, ARCHIVO_ESQUEMA + '.tmp')
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(esquema, archivo)
+    os.replace(ruta_temporal, os.path.join(directorio_cache, ARCHIVO_ESQUEMA))
+
+
+def _codificacion_desde_esquema(esquema: dict) -> Codificacion:
+    return Codificacion(
+        esquema['atributos'],
+        {nombre: np.asarray(categorias) for nombre, categorias in esquema['categorias'].items()},
+        np.asarray(esquema['etiquetas_clases']))
+
+
+def _calcular_hash(ruta: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        while bloque := archivo.read(_TAMANO_BLOQUE_HASH):
+            sha256.update(bloque)
+    return sha256.hexdigest()
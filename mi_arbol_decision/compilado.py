@@ -0,0 +1,329 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from mi_arbol_decision.datos import Codificacion, DatosCodificados
+from mi_arbol_decision.nodo import Nodo
+
+
+class ArbolCompilado:
+    def __init__(self, atributo: np.ndarray, umbral: np.ndarray, inicio_hijos: np.ndarray, hijos: np.ndarray,
+                 clase: np.ndarray, clase_mas_comun: np.ndarray, conteo_clases: np.ndarray, codificacion: Codificacion,
+                 ganancia: np.ndarray | None = None, fraccionar_faltantes: bool = False):
+        # Arreglos paralelos con una posición por nodo; el nodo 0 es la raíz.
+        # Índice (en codificacion.atributos) del atributo de decisión, -1 en los nodos hoja
+        self.atributo: np.ndarray = atributo
+        # Umbral de los nodos continuos (NaN en los nodos categóricos y en las hojas)
+        self.umbral: np.ndarray = umbral
+        # Posición en 'hijos' donde empiezan las ramas del nodo. Un nodo continuo tiene dos ramas
+        # (<= umbral y > umbral); uno categórico tiene una tabla indexada por el código de cada categoría.
+        self.inicio_hijos: np.ndarray = inicio_hijos
+        # Número de nodo hijo de cada rama (-1 si la categoría no tiene rama en ese nodo)
+        self.hijos: np.ndarray = hijos
+        # Código de la clase predicha por cada hoja (-1 en los nodos de decisión)
+        self.clase: np.ndarray = clase
+        # Código de la clase más común de cada nodo, para valores no vistos durante el entrenamiento
+        self.clase_mas_comun: np.ndarray = clase_mas_comun
+        # Matriz (nodos x clases) con la cantidad de instancias de entrenamiento de cada clase en cada nodo
+        # (la suma de sus pesos si el árbol se entrenó con VALORES_FALTANTES.fraccionar)
+        self.conteo_clases: np.ndarray = conteo_clases
+        # Ganancia de la división de cada nodo de decisión (NaN en las hojas). No se guarda con el modelo.
+        self.ganancia: np.ndarray | None = ganancia
+        self.codificacion: Codificacion = codificacion
+        # Si es True, una fila sin valor en el atributo de un nodo baja por todas sus ramas, repartida según el
+        # peso de entrenamiento de cada rama, y se predice la clase con mayor probabilidad combinada (ver
+        # distribuir_faltantes)
+        self.fraccionar_faltantes: bool = fraccionar_faltantes
+        # Cantidad de ramas de cada nodo y fracción del peso de su padre que tiene cada nodo (se preparan en la
+        # primera predicción fraccionada, ver _preparar_fracciones)
+        self._cant_ramas: np.ndarray | None = None
+        self._fraccion_rama: np.ndarray | None = None
+        # Se preparan recién en la primera predicción individual (ver _preparar_recorrido)
+        self._atributo: list[int] | None = None
+
+    @property
+    def cant_nodos(self) -> int:
+        return len(self.atributo)
+
+    # Copias en listas de Python de los arreglos, usadas para recorrer el árbol de a una instancia:
+    # indexar una lista es mucho más barato que indexar un arreglo de NumPy elemento por elemento.
+    # No se crean al construir el objeto para que cargar un modelo no dependa del tamaño del árbol.
+    def _preparar_recorrido(self) -> None:
+        self._umbral: list[float] = self.umbral.tolist()
+        self._inicio_hijos: list[int] = self.inicio_hijos.tolist()
+        self._hijos: list[int] = self.hijos.tolist()
+        self._clase: list[int] = self.clase.tolist()
+        self._clase_mas_comun: list[int] = self.clase_mas_comun.tolist()
+        # Para cada atributo categórico, código de cada categoría según su representación en las ramas
+        self._codigos_categorias: list[dict | None] = [
+            {str(categoria): codigo for codigo, categoria in enumerate(self.codificacion.categorias[nombre])}
+            if nombre in self.codificacion.categorias else None
+            for nombre in self.codificacion.atributos
+        ]
+        # Se asigna al final porque indica que el resto de las copias ya está lista
+        self._atributo = self.atributo.tolist()
+
+    # Predice la clase de una única instancia (diccionario atributo -> valor)
+    def predecir(self, instancia: dict):
+        if self.fraccionar_faltantes:
+            return self.predecir_lote(DataFrame([instancia]))[0]
+        if self._atributo is None:
+            self._preparar_recorrido()
+        atributos = self.codificacion.atributos
+        nodo = 0
+        while self._atributo[nodo] >= 0:
+            indice_atributo = self._atributo[nodo]
+            valor_instancia = instancia[atributos[indice_atributo]]
+            codigos_categorias = self._codigos_categorias[indice_atributo]
+
+            if codigos_categorias is None:
+                rama = 0 if valor_instancia <= self._umbral[nodo] else 1
+                nodo = self._hijos[self._inicio_hijos[nodo] + rama]
+            else:
+                codigo = codigos_categorias.get(valor_instancia, -1)
+                hijo = self._hijos[self._inicio_hijos[nodo] + codigo] if codigo >= 0 else -1
+                if hijo < 0:
+                    # Si el valor no se vio durante el entrenamiento en esta rama, se predice la clase más común
+                    return self.codificacion.etiquetas_clases[self._clase_mas_comun[nodo]]
+                nodo = hijo
+
+        return self.codificacion.etiquetas_clases[self._clase[nodo]]
+
+    # Predice la clase de todas las filas de un DataFrame (o de una matriz con una columna por atributo, en el
+    # orden de codificacion.atributos). Las filas bajan por el árbol de a un nivel por vez: en cada nivel se
+    # agrupan según el atributo de su nodo actual y se enrutan todas juntas con comparaciones vectorizadas.
+    # Con devolver_distribucion=True también devuelve, por fila, la distribución de clases del nodo alcanzado.
+    def predecir_lote(self, instancias: DataFrame | np.ndarray,
+                      devolver_distribucion: bool = False) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        if isinstance(instancias, np.ndarray):
+            instancias = DataFrame(instancias, columns=self.codificacion.atributos)
+        if self.fraccionar_faltantes:
+            distribucion = self.distribuir_faltantes(self.codificar_columnas(instancias), len(instancias))
+            predicciones = self.codificacion.etiquetas_clases[np.argmax(distribucion, axis=1)]
+            return (predicciones, distribucion) if devolver_distribucion else predicciones
+
+        nodo_final = self.buscar_nodos(self.codificar_columnas(instancias), len(instancias))
+        predicciones = self.codificacion.etiquetas_clases[self.codigos_clases(nodo_final)]
+        if not devolver_distribucion:
+            return predicciones
+
+        conteos = self.conteo_clases[nodo_final]
+        return predicciones, conteos / conteos.sum(axis=1, keepdims=True)
+
+    # Baja por el árbol las filas de las columnas codificadas con codificar_columnas. Las filas que llegan a un
+    # nodo marcado en 'cortados' se detienen en él, como si fuera una hoja (se usa su clase más común).
+    def buscar_nodos(self, columnas: dict[int, np.ndarray], cant_instancias: int,
+                     cortados: np.ndarray | None = None) -> np.ndarray:
+        # Nodo en el que terminó cada fila (una hoja o el nodo donde se usó la clase más común)
+        nodo_final = np.zeros(cant_instancias, dtype=np.int32)
+        filas_activas = np.arange(cant_instancias)
+        nodos_activos = np.zeros(cant_instancias, dtype=np.int32)
+
+        while len(filas_activas) > 0:
+            atributos_activos = self.atributo[nodos_activos]
+            es_hoja = atributos_activos < 0
+            if cortados is not None:
+                es_hoja |= cortados[nodos_activos]
+            nodo_final[filas_activas[es_hoja]] = nodos_activos[es_hoja]
+            filas_activas, nodos_activos = filas_activas[~es_hoja], nodos_activos[~es_hoja]
+            atributos_activos = atributos_activos[~es_hoja]
+
+            siguientes_nodos = np.empty(len(filas_activas), dtype=np.int32)
+            for indice_atributo in np.unique(atributos_activos):
+                seleccion = atributos_activos == indice_atributo
+                filas, nodos = filas_activas[seleccion], nodos_activos[seleccion]
+                valores = columnas[indice_atributo][filas]
+                if self.codificacion.es_continuo(self.codificacion.atributos[indice_atributo]):
+                    ramas = np.where(valores <= self.umbral[nodos], 0, 1)
+                    siguientes_nodos[seleccion] = self.hijos[self.inicio_hijos[nodos] + ramas]
+                else:
+                    hijos = self.hijos[self.inicio_hijos[nodos] + np.maximum(valores, 0)]
+                    siguientes_nodos[seleccion] = np.where(valores >= 0, hijos, -1)
+
+            # Las filas con una categoría sin rama se quedan en el nodo actual (se usa su clase más común)
+            sin_rama = siguientes_nodos < 0
+            nodo_final[filas_activas[sin_rama]] = nodos_activos[sin_rama]
+            filas_activas, nodos_activos = filas_activas[~sin_rama], siguientes_nodos[~sin_rama]
+
+        return nodo_final
+
+    # Código de la clase predicha en cada nodo devuelto por buscar_nodos
+    def codigos_clases(self, nodo_final: np.ndarray) -> np.ndarray:
+        return np.where(self.atributo[nodo_final] < 0, self.clase[nodo_final], self.clase_mas_comun[nodo_final])
+
+    # Código de la clase predicha para cada fila de las columnas codificadas, según el modo del árbol
+    # ('cortados' como en buscar_nodos)
+    def predecir_codigos(self, columnas: dict[int, np.ndarray], cant_instancias: int,
+                         cortados: np.ndarray | None = None) -> np.ndarray:
+        if self.fraccionar_faltantes:
+            return np.argmax(self.distribuir_faltantes(columnas, cant_instancias, cortados), axis=1)
+        return self.codigos_clases(self.buscar_nodos(columnas, cant_instancias, cortados))
+
+    # Distribución de clases (filas x clases) de cada fila con el tratamiento de C4.5 para los valores faltantes:
+    # una fila sin valor en el atributo de un nodo (NaN o categoría -1) continúa por todas las ramas con su peso
+    # multiplicado por la fracción del peso de entrenamiento de cada rama, y la distribución de la fila es la
+    # suma de las distribuciones de las hojas a las que llega, ponderadas por el peso con que llega a cada una.
+    # Igual que en buscar_nodos, las filas bajan de a un nivel por vez (un par fila-nodo por cada camino) y se
+    # detienen en los nodos marcados en 'cortados'.
+    def distribuir_faltantes(self, columnas: dict[int, np.ndarray], cant_instancias: int,
+                             cortados: np.ndarray | None = None) -> np.ndarray:
+        if self._fraccion_rama is None:
+            self._preparar_fracciones()
+        conteos = self.conteo_clases.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distribucion_nodos = np.nan_to_num(conteos / conteos.sum(axis=1, keepdims=True))
+
+        distribucion = np.zeros((cant_instancias, self.codificacion.cant_clases))
+        filas_activas = np.arange(cant_instancias)
+        nodos_activos = np.zeros(cant_instancias, dtype=np.int32)
+        pesos_activos = np.ones(cant_instancias)
+
+        while len(filas_activas) > 0:
+            atributos_activos = self.atributo[nodos_activos]
+            siguientes_nodos = np.full(len(filas_activas), -1, dtype=np.int32)
+            faltantes = np.zeros(len(filas_activas), dtype=bool)
+            for indice_atributo in np.unique(atributos_activos[atributos_activos >= 0]):
+                seleccion = atributos_activos == indice_atributo
+                nodos = nodos_activos[seleccion]
+                valores = columnas[indice_atributo][filas_activas[seleccion]]
+                if self.codificacion.es_continuo(self.codificacion.atributos[indice_atributo]):
+                    faltantes[seleccion] = np.isnan(valores)
+                    ramas = np.where(valores <= self.umbral[nodos], 0, 1)
+                    siguientes_nodos[seleccion] = self.hijos[self.inicio_hijos[nodos] + ramas]
+                else:
+                    faltantes[seleccion] = valores < 0
+                    hijos = self.hijos[self.inicio_hijos[nodos] + np.maximum(valores, 0)]
+                    siguientes_nodos[seleccion] = np.where(valores >= 0, hijos, -1)
+            if cortados is not None:
+                en_corte = cortados[nodos_activos]
+                siguientes_nodos[en_corte] = -1
+                faltantes[en_corte] = False
+
+            # Las filas que llegan a una hoja o a una categoría sin rama suman la distribución del nodo actual
+            terminadas = (siguientes_nodos < 0) & ~faltantes
+            np.add.at(distribucion, filas_activas[terminadas],
+                      pesos_activos[terminadas, np.newaxis] * distribucion_nodos[nodos_activos[terminadas]])
+
+            # Las filas sin valor se repiten una vez por cada rama del nodo (las ramas sin nodo se descartan)
+            filas_faltantes, nodos_faltantes = filas_activas[faltantes], nodos_activos[faltantes]
+            cant_ramas = self._cant_ramas[nodos_faltantes]
+            desplazamientos = np.arange(cant_ramas.sum()) - np.repeat(np.cumsum(cant_ramas) - cant_ramas, cant_ramas)
+            hijos_faltantes = self.hijos[np.repeat(self.inicio_hijos[nodos_faltantes], cant_ramas) + desplazamientos]
+            pesos_faltantes = np.repeat(pesos_activos[faltantes], cant_ramas) * self._fraccion_rama[hijos_faltantes]
+            con_rama = hijos_faltantes >= 0
+
+            conocidas = (siguientes_nodos >= 0) & ~faltantes
+            filas_activas = np.concatenate((filas_activas[conocidas],
+                                            np.repeat(filas_faltantes, cant_ramas)[con_rama]))
+            nodos_activos = np.concatenate((siguientes_nodos[conocidas], hijos_faltantes[con_rama]))
+            pesos_activos = np.concatenate((pesos_activos[conocidas], pesos_faltantes[con_rama]))
+
+        return distribucion
+
+    # Cantidad de ramas de cada nodo y fracción del peso de entrenamiento de su padre que tiene cada nodo (1 en
+    # la raíz). Las ramas sin nodo no tienen peso, por lo que las fracciones de los hermanos suman 1.
+    def _preparar_fracciones(self) -> None:
+        cant_ramas = np.zeros(self.cant_nodos, dtype=np.int64)
+        fraccion_rama = np.ones(self.cant_nodos)
+        peso_nodos = self.conteo_clases.sum(axis=1).astype(np.float64)
+        for nodo in np.flatnonzero(self.atributo >= 0):
+            nombre_atributo = self.codificacion.atributos[self.atributo[nodo]]
+            cant_ramas[nodo] = 2 if self.codificacion.es_continuo(nombre_atributo) \
+                else len(self.codificacion.categorias[nombre_atributo])
+            hijos = self.hijos[self.inicio_hijos[nodo]:self.inicio_hijos[nodo] + cant_ramas[nodo]]
+            hijos = hijos[hijos >= 0]
+            if peso_nodos[hijos].sum() > 0:
+                fraccion_rama[hijos] = peso_nodos[hijos] / peso_nodos[hijos].sum()
+        self._cant_ramas = cant_ramas
+        self._fraccion_rama = fraccion_rama
+
+    # Codifica las columnas de los atributos usados por el árbol: float64 para los continuos y el código de la
+    # categoría para los categóricos (-1 si la categoría no se vio durante el entrenamiento).
+    # Con todos_los_atributos=True codifica todas las columnas y no solo las que usa este árbol.
+    def codificar_columnas(self, instancias: DataFrame, todos_los_atributos: bool = False) -> dict[int, np.ndarray]:
+        atributos_faltantes = [nombre for nombre in self.codificacion.atributos if nombre not in instancias.columns]
+        if atributos_faltantes:
+            raise RuntimeError("Faltan los atributos " + str(atributos_faltantes) + " en las instancias.")
+
+        columnas: dict[int, np.ndarray] = {}
+        indices_atributos = range(len(self.codificacion.atributos)) if todos_los_atributos \
+            else np.unique(self.atributo[self.atributo >= 0]).tolist()
+        for indice_atributo in indices_atributos:
+            nombre_atributo = self.codificacion.atributos[indice_atributo]
+            if self.codificacion.es_continuo(nombre_atributo):
+                columnas[indice_atributo] = instancias[nombre_atributo].to_numpy(dtype=np.float64)
+            else:
+                categorias = pd.Index(self.codificacion.categorias[nombre_atributo])
+                columnas[indice_atributo] = categorias.get_indexer(instancias[nombre_atributo])
+        return columnas
+
+    # Toma las columnas de datos ya codificados (por ejemplo, abiertos desde el cache de un CSV) sin copiarlas.
+    # Solo se recodifican los atributos categóricos cuyas categorías no coinciden con las del entrenamiento.
+    def columnas_desde_codificados(self, datos: DatosCodificados) -> dict[int, np.ndarray]:
+        atributos_faltantes = [nombre for nombre in self.codificacion.atributos if nombre not in datos.columnas]
+        if atributos_faltantes:
+            raise RuntimeError("Faltan los atributos " + str(atributos_faltantes) + " en las instancias.")
+
+        columnas: dict[int, np.ndarray] = {}
+        for indice_atributo in np.unique(self.atributo[self.atributo >= 0]).tolist():
+            nombre_atributo = self.codificacion.atributos[indice_atributo]
+            columna = datos.columnas[nombre_atributo]
+            categorias = self.codificacion.categorias.get(nombre_atributo)
+            categorias_datos = datos.codificacion.categorias.get(nombre_atributo)
+            if categorias is None or np.array_equal(categorias, categorias_datos):
+                columnas[indice_atributo] = columna
+            else:
+                codigo_arbol = pd.Index(categorias).get_indexer(categorias_datos)
+                columnas[indice_atributo] = np.where(columna >= 0, codigo_arbol[np.maximum(columna, 0)], -1)
+        return columnas
+
+
+# Aplana un árbol de nodos en arreglos de NumPy. Los nodos se numeran en preorden.
+def compilar_arbol(raiz_arbol: Nodo, codificacion: Codificacion, fraccionar_faltantes: bool = False) -> ArbolCompilado:
+    posicion_atributo = {nombre: posicion for posicion, nombre in enumerate(codificacion.atributos)}
+    codigo_clase = {etiqueta: codigo for codigo, etiqueta in enumerate(codificacion.etiquetas_clases)}
+
+    nodos: list[Nodo] = []
+    numero_nodo: dict[int, int] = {}
+    nodos_pendientes: list[Nodo] = [raiz_arbol]
+    while nodos_pendientes:
+        nodo = nodos_pendientes.pop()
+        numero_nodo[id(nodo)] = len(nodos)
+        nodos.append(nodo)
+        nodos_pendientes.extend(reversed(list(nodo.nodos_hijos.values())))
+
+    cant_nodos = len(nodos)
+    atributo = np.full(cant_nodos, -1, dtype=np.int32)
+    umbral = np.full(cant_nodos, np.nan, dtype=np.float64)
+    inicio_hijos = np.zeros(cant_nodos, dtype=np.int32)
+    clase = np.full(cant_nodos, -1, dtype=np.int32)
+    clase_mas_comun = np.zeros(cant_nodos, dtype=np.int32)
+    # Al fraccionar los valores faltantes los conteos son sumas de pesos
+    conteo_clases = np.zeros((cant_nodos, codificacion.cant_clases),
+                             dtype=np.float64 if fraccionar_faltantes else np.int64)
+    ganancia = np.full(cant_nodos, np.nan, dtype=np.float64)
+    hijos: list[int] = []
+
+    for numero, nodo in enumerate(nodos):
+        clase_mas_comun[numero] = codigo_clase[nodo.clase_mas_comun]
+        if nodo.conteo_clases is not None:
+            conteo_clases[numero] = nodo.conteo_clases
+        if nodo.es_nodo_hoja():
+            clase[numero] = codigo_clase[nodo.valor]
+            continue
+
+        atributo[numero] = posicion_atributo[nodo.atributo]
+        if nodo.ganancia is not None:
+            ganancia[numero] = nodo.ganancia
+        inicio_hijos[numero] = len(hijos)
+        if nodo.umbral is not None:
+            umbral[numero] = nodo.umbral
+            hijos.append(numero_nodo[id(nodo.nodos_hijos[f"<= {nodo.umbral}"])])
+            hijos.append(numero_nodo[id(nodo.nodos_hijos[f"> {nodo.umbral}"])])
+        else:
+            for categoria in codificacion.categorias[nodo.atributo]:
+                nodo_hijo = nodo.nodos_hijos.get(str(categoria))
+                hijos.append(numero_nodo[id(nodo_hijo)] if nodo_hijo is not None else -1)
+
+    return ArbolCompilado(atributo, umbral, inicio_hijos, np.array(hijos, dtype=np.int32), clase, clase_mas_comun,
+                          conteo_clases, codificacion, ganancia, fraccionar_faltantes)
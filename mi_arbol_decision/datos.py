@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+
+class Codificacion:
+    def __init__(self, atributos: list[str], categorias: dict[str, np.ndarray], etiquetas_clases: np.ndarray):
+        # Nombres de los atributos, en el orden de las columnas del conjunto de entrenamiento
+        self.atributos: list[str] = atributos
+        # Valores originales de cada atributo categórico, indexados por su código
+        self.categorias: dict[str, np.ndarray] = categorias
+        # Valores originales de la clase, indexados por su código
+        self.etiquetas_clases: np.ndarray = etiquetas_clases
+
+    def es_continuo(self, nombre_atributo: str) -> bool:
+        return nombre_atributo not in self.categorias
+
+    @property
+    def cant_clases(self) -> int:
+        return len(self.etiquetas_clases)
+
+
+class ColumnaDiscretizada:
+    def __init__(self, bins: np.ndarray, minimos: np.ndarray, maximos: np.ndarray):
+        # Número de bin int64 de cada instancia (-1 si falta el valor). Los bins siguen el orden de los valores.
+        self.bins: np.ndarray = bins
+        # Menor y mayor valor de entrenamiento de cada bin. El umbral entre dos bins es el punto medio entre
+        # el mayor valor del primero y el menor valor del segundo.
+        self.minimos: np.ndarray = minimos
+        self.maximos: np.ndarray = maximos
+
+    @property
+    def cant_bins(self) -> int:
+        return len(self.minimos)
+
+
+class DatosCodificados:
+    def __init__(self, columnas: dict[str, np.ndarray], clases: np.ndarray, codificacion: Codificacion):
+        # Una columna contigua por atributo: códigos int64 para los categóricos y float64 para los continuos
+        self.columnas: dict[str, np.ndarray] = columnas
+        # Código int64 de la clase de cada instancia
+        self.clases: np.ndarray = clases
+        self.codificacion: Codificacion = codificacion
+        # Versión discretizada de los atributos continuos (solo si se entrena con histogramas)
+        self.discretizadas: dict[str, ColumnaDiscretizada] = {}
+
+    @property
+    def cant_instancias(self) -> int:
+        return len(self.clases)
+
+    @property
+    def cant_clases(self) -> int:
+        return self.codificacion.cant_clases
+
+
+class SubconjuntoNodo:
+    def __init__(self, indices: np.ndarray, clases: np.ndarray, conteo_clases: np.ndarray,
+                 histogramas: dict[str, np.ndarray] | None = None,
+                 atributos_descartados: frozenset[str] = frozenset(), profundidad: int = 0,
+                 pesos: np.ndarray | None = None):
+        # Índices (en el conjunto codificado) de las instancias que llegan al nodo y el código de su clase
+        self.indices: np.ndarray = indices
+        self.clases: np.ndarray = clases
+        # Cantidad de instancias de cada clase en el nodo. No se recalcula a partir de las instancias:
+        # la raíz la cuenta una vez y cada hijo la recibe de la división de su padre.
+        # Con pesos, es la suma de los pesos de las instancias de cada clase (float64).
+        self.conteo_clases: np.ndarray = conteo_clases
+        # Peso de cada instancia, solo con VALORES_FALTANTES.fraccionar (una instancia sin valor en un atributo
+        # de división llega a cada rama con una fracción de su peso)
+        self.pesos: np.ndarray | None = pesos
+        self.profundidad: int = profundidad
+        # Histogramas (bins x clases) de los atributos continuos, solo si se entrena con histogramas
+        self.histogramas: dict[str, np.ndarray] | None = histogramas
+        # Atributos que ya no tienen ninguna división válida en un nodo ancestro y, por lo tanto, tampoco en este:
+        # no se vuelven a evaluar
+        self.atributos_descartados: frozenset[str] = atributos_descartados
+        # Los completa la función de impureza: atributos sin división válida en este nodo y cantidad de
+        # atributos evaluados y omitidos
+        self.atributos_sin_division: list[str] = []
+        self.cant_evaluados: int = 0
+        self.cant_omitidos: int = 0
+
+    @property
+    def cant_instancias(self) -> int:
+        return len(self.indices)
+
+    @property
+    def peso_total(self) -> float:
+        return float(self.conteo_clases.sum())
+
+
+def es_atributo_continuo(serie_atributo: Series) -> bool:
+    return pd.api.types.is_numeric_dtype(serie_atributo)
+
+
+# Convierte un DataFrame de entrenamiento en arreglos de NumPy contiguos, una única vez.
+# Los códigos se asignan en el orden de los valores originales, de modo que el código más bajo
+# corresponde al menor valor (igual que el orden que usan groupby() y mode()).
+def codificar_dataframe(df: DataFrame, nombre_objetivo: str) -> DatosCodificados:
+    atributos: list[str] = [columna for columna in df.columns if columna != nombre_objetivo]
+    columnas: dict[str, np.ndarray] = {}
+    categorias: dict[str, np.ndarray] = {}
+
+    for nombre_atributo in atributos:
+        serie_atributo = df[nombre_atributo]
+        if es_atributo_continuo(serie_atributo):
+            columnas[nombre_atributo] = np.ascontiguousarray(serie_atributo.to_numpy(dtype=np.float64))
+        else:
+            codigos, valores = pd.factorize(serie_atributo, sort=True)
+            columnas[nombre_atributo] = np.ascontiguousarray(codigos, dtype=np.int64)
+            categorias[nombre_atributo] = np.asarray(valores)
+
+    clases, etiquetas_clases = pd.factorize(df[nombre_objetivo], sort=True)
+    codificacion = Codificacion(atributos, categorias, np.asarray(etiquetas_clases))
+    return DatosCodificados(columnas, np.ascontiguousarray(clases, dtype=np.int64), codificacion)
+
+
+# Agrupa los valores de una columna continua en a lo sumo max_bins bins con aproximadamente la misma cantidad
+# de instancias. Si la columna tiene max_bins valores distintos o menos, cada valor ocupa su propio bin y los
+# umbrales posibles son los mismos que en la búsqueda exacta.
+def discretizar_columna(valores: np.ndarray, max_bins: int) -> ColumnaDiscretizada:
+    bins = np.full(len(valores), -1, dtype=np.int64)
+    presentes = ~np.isnan(valores)
+    valores_unicos, posicion_valor, conteos = np.unique(valores[presentes], return_inverse=True, return_counts=True)
+
+    if len(valores_unicos) <= max_bins:
+        bins[presentes] = posicion_valor
+        return ColumnaDiscretizada(bins, valores_unicos, valores_unicos)
+
+    # Cada valor va al bin que le corresponde según la cantidad de instancias con valores menores
+    # (un valor nunca se reparte entre dos bins). Los bins que quedan vacíos se descartan.
+    cant_menores = np.cumsum(conteos) - conteos
+    bin_valor = cant_menores * max_bins // len(posicion_valor)
+    bins_usados, bin_valor = np.unique(bin_valor, return_inverse=True)
+    primer_valor = np.searchsorted(bin_valor, np.arange(len(bins_usados)), side='left')
+    ultimo_valor = np.searchsorted(bin_valor, np.arange(len(bins_usados)), side='right') - 1
+
+    bins[presentes] = bin_valor[posicion_valor]
+    return ColumnaDiscretizada(bins, valores_unicos[primer_valor], valores_unicos[ultimo_valor])
+
+
+def discretizar_continuos(datos: DatosCodificados, max_bins: int) -> None:
+    for nombre_atributo in datos.codificacion.atributos:
+        if datos.codificacion.es_continuo(nombre_atributo):
+            datos.discretizadas[nombre_atributo] = discretizar_columna(datos.columnas[nombre_atributo], max_bins)
+
+
+# Guarda las columnas codificadas y las clases en archivos .npy dentro de 'directorio', para que otros procesos
+# las abran con abrir_datos_codificados sin recibir una copia de los datos
+def guardar_datos_codificados(datos: DatosCodificados, directorio: str) -> None:
+    for posicion, nombre_atributo in enumerate(datos.codificacion.atributos):
+        np.save(os.path.join(directorio, f'atributo_{posicion}.npy'), datos.columnas[nombre_atributo])
+    np.save(os.path.join(directorio, 'clases.npy'), datos.clases)
+
+
+# Abre con np.memmap, en modo de solo lectura, los datos guardados con guardar_datos_codificados. Todos los
+# procesos que los abren comparten las mismas páginas de memoria.
+def abrir_datos_codificados(directorio: str, codificacion: Codificacion) -> DatosCodificados:
+    columnas = {nombre_atributo: np.load(os.path.join(directorio, f'atributo_{posicion}.npy'), mmap_mode='r')
+                for posicion, nombre_atributo in enumerate(codificacion.atributos)}
+    clases = np.load(os.path.join(directorio, 'clases.npy'), mmap_mode='r')
+    return DatosCodificados(columnas, clases, codificacion)
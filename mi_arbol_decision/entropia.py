@@ -18,8 +18,4 @@ def calcular_entropia(s: Series) -> float:
     if entropia != 0:
         entropia *= -1
 
-    print("\nSerie:")
-    print(s)
-    print("Entropia: ", entropia)
-
     return float(entropia)
\ No newline at end of file
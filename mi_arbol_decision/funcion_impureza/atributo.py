@@ -1,8 +1,17 @@
+import numpy as np
+
+
 class Atributo:
-    def __init__(self, nombre: str = '', ganancia: float = -1, umbral: float | None = None):
+    def __init__(self, nombre: str = '', ganancia: float = -1, umbral: float | None = None,
+                 conteos_ramas: np.ndarray | None = None, entropia_division: float = 0):
         self.nombre: str = nombre
         self.ganancia: float = ganancia
         self.umbral: float | None = umbral
+        # Cantidad de instancias de cada clase en cada rama de la división (ramas x clases): las ramas
+        # "<= umbral" y "> umbral" de un atributo continuo, o una rama por código de un atributo categórico
+        self.conteos_ramas: np.ndarray | None = conteos_ramas
+        # Entropía de la distribución de instancias entre las ramas de la división (split info)
+        self.entropia_division: float = entropia_division
 
     def es_categorico(self) -> bool:
         return self.umbral is None
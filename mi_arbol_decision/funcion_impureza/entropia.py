@@ -23,8 +23,32 @@ def calcular_entropia(s: Series) -> float:
     if entropia != 0:
         entropia *= -1
 
-    print("\nSerie:")
-    print(s)
-    print("Entropia: ", entropia)
-
     return float(entropia)
+
+
+# Calcula la entropía a partir de conteos de instancias por clase.
+# Recibe un vector de conteos (devuelve un float) o una matriz con un vector de conteos por fila
+# (devuelve la entropía de cada fila). Produce los mismos valores que calcular_entropia.
+# Si se indica cant_instancias_total, las probabilidades se calculan sobre ese total en lugar de sobre la suma de
+# los conteos, como hace calcular_entropia con una serie con valores faltantes (value_counts() no los cuenta,
+# pero len() sí).
+def calcular_entropia_conteos(conteos: np.ndarray, cant_instancias_total: float | None = None) -> float | np.ndarray:
+    conteos = np.asarray(conteos)
+    if conteos.ndim == 1:
+        # En un vector se descartan las clases sin instancias, igual que hace value_counts()
+        conteos = conteos[conteos > 0]
+        if len(conteos) == 0:
+            return 0
+        return float(calcular_entropia_conteos(conteos[np.newaxis], cant_instancias_total)[0])
+
+    # Ordenar los conteos de mayor a menor para sumar en el mismo orden que value_counts()
+    conteos = -np.sort(-conteos, axis=-1)
+    if cant_instancias_total is None:
+        cant_instancias_total = conteos.sum(axis=-1, keepdims=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilidades_por_clase = conteos / cant_instancias_total
+        terminos = np.where(conteos > 0, probabilidades_por_clase * np.log2(probabilidades_por_clase), 0.0)
+
+    entropia = np.sum(terminos, axis=-1)
+    return np.where(entropia != 0, -entropia, 0.0)
@@ -0,0 +1,20 @@
+import numpy as np
+
+from mi_arbol_decision.funcion_impureza.reduccion_impureza import ReduccionImpureza
+
+
+# Calcula el error de clasificación (1 - proporción de la clase mayoritaria) a partir de conteos de instancias
+# por clase. Recibe un vector de conteos (devuelve un float) o una matriz con un vector de conteos por fila
+# (devuelve el error de cada fila).
+def calcular_error_clasificacion_conteos(conteos: np.ndarray) -> float | np.ndarray:
+    conteos = np.asarray(conteos)
+    cant_instancias_total = conteos.sum(axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.where(cant_instancias_total > 0, 1 - conteos.max(axis=-1) / cant_instancias_total, 0.0)
+    return float(error) if conteos.ndim == 1 else error
+
+
+class ErrorDeClasificacion(ReduccionImpureza):
+    def calcular_impureza(self, conteos: np.ndarray) -> float | np.ndarray:
+        return calcular_error_clasificacion_conteos(conteos)
@@ -1,16 +1,94 @@
+import os
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
-from pandas import DataFrame
+import numpy as np
 
+from compartido.perfil import Perfil
+from mi_arbol_decision.datos import DatosCodificados, SubconjuntoNodo
 from mi_arbol_decision.funcion_impureza.atributo import Atributo
 
 
 class FuncionImpureza(ABC):
+    # Por debajo de esta cantidad de instancias el costo de repartir el trabajo supera al de evaluar
+    min_instancias_paralelo: int = 2000
+
+    def __init__(self, n_jobs: int = 1):
+        # Cantidad de hilos para evaluar atributos en paralelo (-1 usa todos los núcleos)
+        self.n_jobs: int = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self._ejecutor: ThreadPoolExecutor | None = None
+        self._bloqueo_ejecutor = threading.Lock()
+        # Perfil donde se registran los tiempos y contadores de la evaluación (lo asigna el árbol)
+        self.perfil: Perfil = Perfil()
+
+    # Recibe los datos codificados del árbol y las instancias que llegan al nodo, con su conteo de clases.
+    # Si el nodo tiene histogramas (entrenamiento con max_bins), los umbrales de los atributos continuos
+    # se buscan sobre ellos en lugar de sobre los valores.
     @abstractmethod
-    def encontrar_mejor_atributo(self, df: DataFrame, atributos_disponibles: list[str]) -> Atributo:
+    def encontrar_mejor_atributo(self, datos: DatosCodificados, nodo: SubconjuntoNodo,
+                                 atributos_disponibles: list[str]) -> Atributo:
         pass
 
+    # Aplica la función de evaluación a cada atributo disponible que no esté descartado en el nodo. Si hay más
+    # de un hilo disponible los atributos se evalúan en paralelo (los kernels de NumPy liberan el GIL), pero los
+    # resultados se devuelven siempre en el orden de atributos_disponibles, de modo que el desempate es el mismo
+    # que en la versión secuencial. Los atributos sin ninguna división válida se registran en el nodo.
+    def _evaluar_atributos(self, evaluar: Callable[[str], Atributo], nodo: SubconjuntoNodo,
+                           atributos_disponibles: list[str]) -> list[Atributo]:
+        atributos_evaluados = [nombre_atributo for nombre_atributo in atributos_disponibles
+                               if nombre_atributo not in nodo.atributos_descartados]
+        nodo.cant_evaluados = len(atributos_evaluados)
+        nodo.cant_omitidos = len(atributos_disponibles) - len(atributos_evaluados)
+
+        if self.n_jobs == 1 or len(atributos_evaluados) < 2 or nodo.cant_instancias < self.min_instancias_paralelo:
+            atributos = [evaluar(nombre_atributo) for nombre_atributo in atributos_evaluados]
+        else:
+            # Varios nodos pueden construirse a la vez (construcción paralela de subárboles)
+            with self._bloqueo_ejecutor:
+                if self._ejecutor is None:
+                    self._ejecutor = ThreadPoolExecutor(max_workers=self.n_jobs)
+            atributos = list(self._ejecutor.map(evaluar, atributos_evaluados))
+
+        nodo.atributos_sin_division = [atributo.nombre for atributo in atributos
+                                       if not self._tiene_division_valida(atributo, nodo)]
+        return atributos
+
+    # Un atributo no tiene ninguna división válida si es continuo y todos sus valores son iguales, o si es
+    # categórico y todas las instancias tienen el mismo valor. Lo mismo vale para cualquier subconjunto de las
+    # instancias, por lo que el atributo puede descartarse en todos los descendientes del nodo.
+    @staticmethod
+    def _tiene_division_valida(atributo: Atributo, nodo: SubconjuntoNodo) -> bool:
+        if atributo.conteos_ramas is None:
+            return False
+        cant_por_rama = atributo.conteos_ramas.sum(axis=1)
+        if nodo.pesos is not None:
+            # Con pesos, las instancias sin valor no cuentan en la división (van a todas las ramas)
+            return np.count_nonzero(cant_por_rama) > 1
+        return np.count_nonzero(cant_por_rama) > 1 or cant_por_rama.sum() < nodo.cant_instancias
+
+    # Libera los hilos usados para evaluar atributos en paralelo
+    def cerrar(self) -> None:
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
+
+    # El bloqueo y los hilos no se pueden serializar: se descartan al guardar (por ejemplo, con el árbol entrenado)
+    # y al cargar se crea un bloqueo nuevo; el ejecutor se vuelve a crear cuando se necesite
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_bloqueo_ejecutor']
+        estado['_ejecutor'] = None
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._bloqueo_ejecutor = threading.Lock()
+
 
 class FUNCIONES_IMPUREZA:
     ganancia_informacion = 'ganancia_de_informacion'
     tasa_ganancia_informacion = 'tasa_de_ganancia_de_informacion'
+    indice_gini = 'indice_gini'
+    error_clasificacion = 'error_de_clasificacion'
@@ -0,0 +1,21 @@
+import numpy as np
+
+from mi_arbol_decision.funcion_impureza.reduccion_impureza import ReduccionImpureza
+
+
+# Calcula el índice de Gini (1 - suma de p^2) a partir de conteos de instancias por clase.
+# Recibe un vector de conteos (devuelve un float) o una matriz con un vector de conteos por fila
+# (devuelve el índice de cada fila). No usa logaritmos, por lo que es más barato que la entropía.
+def calcular_gini_conteos(conteos: np.ndarray) -> float | np.ndarray:
+    conteos = np.asarray(conteos, dtype=np.float64)
+    cant_instancias_total = conteos.sum(axis=-1)
+    suma_cuadrados = np.square(conteos).sum(axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gini = np.where(cant_instancias_total > 0, 1 - suma_cuadrados / np.square(cant_instancias_total), 0.0)
+    return float(gini) if conteos.ndim == 1 else gini
+
+
+class IndiceGini(ReduccionImpureza):
+    def calcular_impureza(self, conteos: np.ndarray) -> float | np.ndarray:
+        return calcular_gini_conteos(conteos)
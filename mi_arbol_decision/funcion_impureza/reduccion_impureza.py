@@ -0,0 +1,167 @@
+from abc import abstractmethod
+
+import numpy as np
+
+from mi_arbol_decision.datos import DatosCodificados, SubconjuntoNodo
+from mi_arbol_decision.funcion_impureza.atributo import Atributo
+from mi_arbol_decision.funcion_impureza.entropia import calcular_entropia_conteos
+from mi_arbol_decision.funcion_impureza.funcion import FuncionImpureza
+from mi_arbol_decision.funcion_impureza.umbral_continuo import buscar_mejor_umbral, buscar_mejor_umbral_histograma
+
+
+# Función de impureza cuyo criterio es la reducción de impureza (ganancia) que produce cada división:
+# la impureza del nodo menos el promedio ponderado de la impureza de sus ramas. Las subclases definen la
+# medida de impureza con calcular_impureza, que trabaja sobre conteos de instancias por clase, de modo que
+# todos los umbrales candidatos de un atributo se evalúan con una sola expresión de NumPy.
+class ReduccionImpureza(FuncionImpureza):
+    def __init__(self, nombre_objetivo: str = '', n_jobs: int = 1):
+        super().__init__(n_jobs)
+        self.nombre_objetivo: str = nombre_objetivo
+
+    # Recibe un vector de conteos por clase (devuelve un float) o una matriz con un vector por fila
+    # (devuelve la impureza de cada fila)
+    @abstractmethod
+    def calcular_impureza(self, conteos: np.ndarray) -> float | np.ndarray:
+        pass
+
+    #  Itera sobre los atributos y encuentra el que tiene la mayor ganancia.
+    #  Maneja tanto atributos continuos como categóricos.
+    def encontrar_mejor_atributo(self, datos: DatosCodificados, nodo: SubconjuntoNodo,
+                                 atributos_disponibles: list[str]) -> Atributo:
+        mejor_atributo: Atributo = Atributo()
+        # Impureza del conjunto de datos (p0), una única vez por nodo
+        impureza_conjunto: float = self.calcular_impureza(nodo.conteo_clases)
+
+        atributos = self._evaluar_atributos(
+            lambda nombre_atributo: self.calcular_ganancia_atributo(datos, nodo, nombre_atributo, impureza_conjunto),
+            nodo, atributos_disponibles)
+        for atributo in atributos:
+            if atributo.ganancia > mejor_atributo.ganancia:
+                mejor_atributo = atributo
+
+        return mejor_atributo
+
+    def calcular_ganancia_atributo(self, datos: DatosCodificados, nodo: SubconjuntoNodo, nombre_atributo: str,
+                                   impureza_conjunto: float) -> Atributo:
+        if nodo.pesos is not None:
+            return self._calcular_ganancia_atributo_fraccionada(datos, nodo, nombre_atributo)
+        atributo = Atributo(nombre=nombre_atributo)
+        self.perfil.contar('atributos_evaluados', 1, nodo.profundidad)
+        if nodo.histogramas is not None and nombre_atributo in nodo.histogramas:
+            with self.perfil.medir('umbral_histograma', nodo.profundidad):
+                ganancia, umbral, conteos_ramas, cant_candidatos = buscar_mejor_umbral_histograma(
+                    nodo.histogramas[nombre_atributo], datos.discretizadas[nombre_atributo], nodo.conteo_clases,
+                    impureza_conjunto, self.calcular_impureza)
+            self.perfil.contar('candidatos_evaluados', cant_candidatos, nodo.profundidad)
+            atributo.ganancia = ganancia
+            atributo.umbral = umbral
+            atributo.conteos_ramas = conteos_ramas
+            atributo.entropia_division = self._calcular_entropia_division_continua(conteos_ramas)
+            return atributo
+
+        self.perfil.contar('filas_recorridas', nodo.cant_instancias, nodo.profundidad)
+        valores = datos.columnas[nombre_atributo][nodo.indices]
+        if datos.codificacion.es_continuo(nombre_atributo):
+            with self.perfil.medir('umbral_continuo', nodo.profundidad):
+                ganancia, umbral, conteos_ramas, cant_candidatos = buscar_mejor_umbral(
+                    valores, nodo.clases, impureza_conjunto, datos.cant_clases, self.calcular_impureza)
+            self.perfil.contar('candidatos_evaluados', cant_candidatos, nodo.profundidad)
+            atributo.ganancia = ganancia
+            atributo.umbral = umbral
+            atributo.conteos_ramas = conteos_ramas
+            atributo.entropia_division = self._calcular_entropia_division_continua(conteos_ramas)
+        else:
+            cant_valores = len(datos.codificacion.categorias[nombre_atributo])
+            with self.perfil.medir('atributo_categorico', nodo.profundidad):
+                ganancia, conteos_ramas = self._calcular_ganancia_atributo_categorico(valores, nodo.clases,
+                                                                                      cant_valores,
+                                                                                      datos.cant_clases,
+                                                                                      impureza_conjunto)
+            self.perfil.contar('candidatos_evaluados', 1, nodo.profundidad)
+            atributo.ganancia = ganancia
+            atributo.umbral = None
+            atributo.conteos_ramas = conteos_ramas
+            # Como en calcular_entropia(df[atributo]), las instancias sin valor no forman una rama pero sí cuentan en
+            # el total
+            atributo.entropia_division = calcular_entropia_conteos(conteos_ramas.sum(axis=1), nodo.cant_instancias)
+
+        return atributo
+
+    # Ganancia de C4.5 con valores faltantes (VALORES_FALTANTES.fraccionar): la reducción de impureza se calcula
+    # solo con las instancias que tienen valor en el atributo (con sus pesos) y se multiplica por la fracción del
+    # peso del nodo que representan. En la entropía de la división las instancias sin valor son una rama más.
+    # Usa los mismos kernels que la búsqueda sin pesos, por lo que el costo es prácticamente el mismo.
+    def _calcular_ganancia_atributo_fraccionada(self, datos: DatosCodificados, nodo: SubconjuntoNodo,
+                                                nombre_atributo: str) -> Atributo:
+        atributo = Atributo(nombre=nombre_atributo)
+        self.perfil.contar('atributos_evaluados', 1, nodo.profundidad)
+        if nodo.histogramas is not None and nombre_atributo in nodo.histogramas:
+            # Los histogramas solo cuentan a las instancias con valor
+            histograma = nodo.histogramas[nombre_atributo]
+            conteo_conocidos = histograma.sum(axis=0)
+            with self.perfil.medir('umbral_histograma', nodo.profundidad):
+                ganancia, umbral, conteos_ramas, cant_candidatos = buscar_mejor_umbral_histograma(
+                    histograma, datos.discretizadas[nombre_atributo], conteo_conocidos,
+                    self.calcular_impureza(conteo_conocidos), self.calcular_impureza)
+        else:
+            self.perfil.contar('filas_recorridas', nodo.cant_instancias, nodo.profundidad)
+            valores = datos.columnas[nombre_atributo][nodo.indices]
+            continuo = datos.codificacion.es_continuo(nombre_atributo)
+            conocidos = ~np.isnan(valores) if continuo else valores >= 0
+            valores, clases, pesos = valores[conocidos], nodo.clases[conocidos], nodo.pesos[conocidos]
+            conteo_conocidos = np.bincount(clases, weights=pesos, minlength=datos.cant_clases)
+            impureza_conocidos = self.calcular_impureza(conteo_conocidos)
+            if continuo:
+                with self.perfil.medir('umbral_continuo', nodo.profundidad):
+                    ganancia, umbral, conteos_ramas, cant_candidatos = buscar_mejor_umbral(
+                        valores, clases, impureza_conocidos, datos.cant_clases, self.calcular_impureza, pesos)
+            else:
+                cant_valores = len(datos.codificacion.categorias[nombre_atributo])
+                with self.perfil.medir('atributo_categorico', nodo.profundidad):
+                    ganancia, conteos_ramas = self._calcular_ganancia_atributo_categorico(
+                        valores, clases, cant_valores, datos.cant_clases, impureza_conocidos, pesos)
+                umbral, cant_candidatos = None, 1
+        self.perfil.contar('candidatos_evaluados', cant_candidatos, nodo.profundidad)
+        if conteos_ramas is None:
+            return atributo
+
+        peso_por_rama = conteos_ramas.sum(axis=1)
+        peso_conocido = peso_por_rama.sum()
+        atributo.ganancia = peso_conocido / nodo.peso_total * ganancia
+        atributo.umbral = umbral
+        atributo.conteos_ramas = conteos_ramas
+        atributo.entropia_division = calcular_entropia_conteos(np.append(peso_por_rama,
+                                                                         nodo.peso_total - peso_conocido))
+        return atributo
+
+    # Entropía de la división binaria elegida. Las instancias sin valor no forman parte de ninguna rama,
+    # igual que al calcular la ganancia.
+    def _calcular_entropia_division_continua(self, conteos_ramas: np.ndarray | None) -> float:
+        if conteos_ramas is None:
+            return 0
+        return calcular_entropia_conteos(conteos_ramas.sum(axis=1))
+
+    # Devuelve la ganancia y el conteo de clases de cada valor del atributo (una fila por código).
+    # Con 'pesos', los conteos son sumas de los pesos de las instancias.
+    def _calcular_ganancia_atributo_categorico(self, codigos: np.ndarray, clases: np.ndarray, cant_valores: int,
+                                               cant_clases: int, impureza_conjunto: float,
+                                               pesos: np.ndarray | None = None) -> tuple[float, np.ndarray]:
+        cant_instancias_total = len(codigos) if pesos is None else pesos.sum()
+        # Las instancias sin valor (código -1) no forman parte de ningún subconjunto
+        validos = codigos >= 0
+        codigos, clases = codigos[validos], clases[validos]
+
+        # Conteo de instancias por cada par (valor del atributo, clase)
+        conteos_ramas = np.bincount(codigos * cant_clases + clases,
+                                    weights=pesos[validos] if pesos is not None else None,
+                                    minlength=cant_valores * cant_clases).reshape(cant_valores, cant_clases)
+
+        # Los valores se recorren en el orden en que aparecen en el subconjunto
+        valores_unicos, primera_aparicion = np.unique(codigos, return_index=True)
+        conteos = conteos_ramas[valores_unicos[np.argsort(primera_aparicion)]]
+
+        probabilidades_valor_atributo = conteos.sum(axis=1) / cant_instancias_total
+        impureza_atributo: float = (probabilidades_valor_atributo * self.calcular_impureza(conteos)).sum()
+
+        ganancia: float = impureza_conjunto - impureza_atributo
+        return ganancia, conteos_ramas
@@ -0,0 +1,109 @@
+from collections.abc import Callable
+
+import numpy as np
+
+from mi_arbol_decision.datos import ColumnaDiscretizada
+from mi_arbol_decision.funcion_impureza.entropia import calcular_entropia_conteos
+
+
+# Busca el mejor punto de corte binario (<= umbral / > umbral) de un atributo continuo.
+# La columna se ordena una sola vez y se recorre con conteos acumulados por clase, de modo que
+# todos los puntos de corte candidatos se evalúan en una única pasada vectorizada: O(n log n).
+# 'calcular_impureza' recibe una matriz de conteos por clase y devuelve la impureza de cada fila
+# (por defecto la entropía, con lo que la ganancia es la ganancia de información).
+# Las instancias a las que les falta el valor (NaN) no generan puntos de corte ni se cuentan en ninguna de
+# las dos ramas, igual que al dividir el nodo, pero sí en el total con el que se pondera cada rama.
+# Devuelve la ganancia, el umbral, el conteo de clases de las ramas "<= umbral" y "> umbral" y la cantidad
+# de puntos de corte evaluados. Con 'pesos', cada instancia aporta su peso a los conteos en lugar de 1.
+def buscar_mejor_umbral(valores: np.ndarray, clases: np.ndarray, impureza_conjunto: float, cant_clases: int,
+                        calcular_impureza: Callable = calcular_entropia_conteos,
+                        pesos: np.ndarray | None = None) -> tuple[float, float | None, np.ndarray | None, int]:
+    cant_instancias_total = len(valores)
+
+    # Ordenar la columna (y sus clases) una única vez. Los NaN quedan al final del orden y se descartan.
+    orden = np.argsort(valores, kind='stable')
+    cant_con_valor = int(np.count_nonzero(~np.isnan(valores)))
+    orden = orden[:cant_con_valor]
+    valores_ordenados = valores[orden]
+    clases_ordenadas = clases[orden]
+    if cant_con_valor == 0:
+        return -1, None, None, 0
+
+    # Valores únicos ordenados y puntos de corte candidatos (punto medio entre valores consecutivos)
+    es_valor_nuevo = np.empty(cant_con_valor, dtype=bool)
+    es_valor_nuevo[0] = True
+    np.not_equal(valores_ordenados[1:], valores_ordenados[:-1], out=es_valor_nuevo[1:])
+    valores_unicos = valores_ordenados[es_valor_nuevo]
+    if len(valores_unicos) < 2:
+        return -1, None, None, 0
+    puntos_corte = (valores_unicos[:-1] + valores_unicos[1:]) / 2
+
+    # Cantidad de instancias que quedan en la rama "<= umbral" para cada punto de corte
+    cant_menor_igual = np.searchsorted(valores_ordenados, puntos_corte, side='right')
+
+    # Conteo acumulado de instancias (o suma acumulada de pesos) por clase a lo largo de la columna ordenada
+    if pesos is None:
+        conteos_acumulados = np.zeros((cant_con_valor + 1, cant_clases), dtype=np.int64)
+        for clase in range(cant_clases):
+            np.cumsum(clases_ordenadas == clase, out=conteos_acumulados[1:, clase])
+    else:
+        pesos_ordenados = pesos[orden]
+        conteos_acumulados = np.zeros((cant_con_valor + 1, cant_clases), dtype=np.float64)
+        for clase in range(cant_clases):
+            np.cumsum(np.where(clases_ordenadas == clase, pesos_ordenados, 0.0), out=conteos_acumulados[1:, clase])
+
+    conteos_menor_igual = conteos_acumulados[cant_menor_igual]
+    conteos_mayor = conteos_acumulados[-1] - conteos_menor_igual
+    if pesos is None:
+        cant_mayor = cant_con_valor - cant_menor_igual
+    else:
+        # Las ramas se ponderan por su peso y no por su cantidad de instancias
+        cant_menor_igual = conteos_menor_igual.sum(axis=1)
+        cant_mayor = conteos_mayor.sum(axis=1)
+        cant_instancias_total = pesos.sum()
+
+    # Calcular la impureza ponderada de cada división
+    prob_menor_igual = cant_menor_igual / cant_instancias_total
+    prob_mayor = cant_mayor / cant_instancias_total
+    impurezas_atributo = (prob_menor_igual * calcular_impureza(conteos_menor_igual) +
+                          prob_mayor * calcular_impureza(conteos_mayor))
+
+    # Ante empates se conserva el primer punto de corte (el de menor valor)
+    ganancias = impureza_conjunto - impurezas_atributo
+    indice_mejor = int(np.argmax(ganancias))
+    conteos_ramas = np.stack([conteos_menor_igual[indice_mejor], conteos_mayor[indice_mejor]])
+    return ganancias[indice_mejor], puntos_corte[indice_mejor], conteos_ramas, len(puntos_corte)
+
+
+# Busca el mejor punto de corte binario a partir del histograma (bins x clases) del atributo en el nodo.
+# Solo se evalúa un corte por cada bin con instancias (salvo el último), por lo que el costo depende de la
+# cantidad de bins y no de la cantidad de instancias. 'conteo_clases' es el conteo por clase de todo el nodo:
+# igual que en la búsqueda exacta, las instancias sin valor no se cuentan en ninguna rama pero sí en el total.
+# El histograma y 'conteo_clases' pueden ser sumas de pesos (float64) en lugar de cantidades de instancias.
+def buscar_mejor_umbral_histograma(histograma: np.ndarray, columna: ColumnaDiscretizada, conteo_clases: np.ndarray,
+                                   impureza_conjunto: float, calcular_impureza: Callable = calcular_entropia_conteos
+                                   ) -> tuple[float, float | None, np.ndarray | None, int]:
+    bins_con_instancias = np.flatnonzero(histograma.any(axis=1))
+    if len(bins_con_instancias) < 2:
+        return -1, None, None, 0
+    cant_instancias_total = conteo_clases.sum()
+
+    # El corte después del bin k deja en la rama "<= umbral" a las instancias de los bins 0..k
+    bins_corte = bins_con_instancias[:-1]
+    conteos_acumulados = np.cumsum(histograma, axis=0)
+    conteos_menor_igual = conteos_acumulados[bins_corte]
+    conteos_mayor = conteos_acumulados[-1] - conteos_menor_igual
+    cant_menor_igual = conteos_menor_igual.sum(axis=1)
+    cant_mayor = conteos_mayor.sum(axis=1)
+
+    prob_menor_igual = cant_menor_igual / cant_instancias_total
+    prob_mayor = cant_mayor / cant_instancias_total
+    impurezas_atributo = (prob_menor_igual * calcular_impureza(conteos_menor_igual) +
+                          prob_mayor * calcular_impureza(conteos_mayor))
+
+    ganancias = impureza_conjunto - impurezas_atributo
+    indice_mejor = int(np.argmax(ganancias))
+    # El umbral queda entre el mayor valor del bin de corte y el menor valor del siguiente bin con instancias
+    umbral = (columna.maximos[bins_corte[indice_mejor]] + columna.minimos[bins_con_instancias[indice_mejor + 1]]) / 2
+    conteos_ramas = np.stack([conteos_menor_igual[indice_mejor], conteos_mayor[indice_mejor]])
+    return ganancias[indice_mejor], umbral, conteos_ramas, len(bins_corte)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from mi_arbol_decision.datos import DatosCodificados
+
+
+# Calcula, para cada atributo continuo discretizado, la matriz (bins x clases) con la cantidad de instancias
+# de cada clase en cada bin. Las instancias sin valor no se cuentan en ningún bin.
+# Con 'pesos' (uno por índice) cada bin suma el peso de sus instancias en lugar de contarlas.
+def calcular_histogramas(datos: DatosCodificados, indices: np.ndarray,
+                         pesos: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    clases = datos.clases[indices]
+    histogramas: dict[str, np.ndarray] = {}
+    for nombre_atributo, columna in datos.discretizadas.items():
+        bins = columna.bins[indices]
+        presentes = bins >= 0
+        conteos = np.bincount(bins[presentes] * datos.cant_clases + clases[presentes],
+                              weights=pesos[presentes] if pesos is not None else None,
+                              minlength=columna.cant_bins * datos.cant_clases)
+        histogramas[nombre_atributo] = conteos.reshape(columna.cant_bins, datos.cant_clases)
+    return histogramas
+
+
+# Calcula los histogramas de los hijos de un nodo cuyo segmento de índices ya fue particionado ('limites'
+# relativos al segmento, como los devuelve particionar). Solo se recorren las instancias de los hijos más
+# chicos: el histograma del hijo más grande se obtiene restando los demás al histograma del padre.
+# Devuelve un diccionario de histogramas por rama (None en las ramas sin instancias).
+def calcular_histogramas_hijos(datos: DatosCodificados, indices: np.ndarray, limites: np.ndarray,
+                               histogramas_padre: dict[str, np.ndarray]) -> list[dict[str, np.ndarray] | None]:
+    cant_ramas = len(limites) - 1
+    tamanos = np.diff(limites)
+    rama_mayor = int(np.argmax(tamanos))
+
+    histogramas_hijos: list[dict[str, np.ndarray] | None] = [None] * cant_ramas
+    restantes = {nombre: histograma.copy() for nombre, histograma in histogramas_padre.items()}
+    # Las instancias que no van a ninguna rama (valor faltante en el atributo de división) también se restan
+    segmentos = [(rama, limites[rama], limites[rama + 1]) for rama in range(cant_ramas) if rama != rama_mayor]
+    segmentos.append((None, limites[-1], len(indices)))
+    for rama, inicio, fin in segmentos:
+        if inicio == fin:
+            continue
+        histogramas = calcular_histogramas(datos, indices[inicio:fin])
+        for nombre, histograma in histogramas.items():
+            restantes[nombre] -= histograma
+        if rama is not None:
+            histogramas_hijos[rama] = histogramas
+
+    if tamanos[rama_mayor] > 0:
+        histogramas_hijos[rama_mayor] = restantes
+    return histogramas_hijos
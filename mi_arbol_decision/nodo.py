@@ -1,5 +1,6 @@
 class Nodo:
-    def __init__(self, atributo=None, nodos_hijos=None, valor=None, clase_mas_comun=None, umbral=None):
+    def __init__(self, atributo=None, nodos_hijos=None, valor=None, clase_mas_comun=None, umbral=None,
+                 conteo_clases=None, ganancia=None):
         # Nombre del atributo para la decisión
         self.atributo: str = atributo
         # Diccionario para guardar las ramas hacia nodos de menor nivel en el árbol
@@ -10,6 +11,10 @@ class Nodo:
         self.clase_mas_comun = clase_mas_comun
         # Umbral para dividir atributos continuos
         self.umbral: float | None = umbral
+        # Cantidad de instancias de entrenamiento de cada clase (indexada por código de clase) en este nodo
+        self.conteo_clases = conteo_clases
+        # Reducción de impureza de la división (solo en los nodos de decisión)
+        self.ganancia: float | None = ganancia
 
     def es_nodo_hoja(self):
         return self.valor is not None
\ No newline at end of file
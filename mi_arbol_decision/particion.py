@@ -0,0 +1,16 @@
+import numpy as np
+
+
+# Reordena en el lugar un segmento del arreglo de índices para que las instancias de cada rama queden
+# contiguas, conservando su orden relativo, y devuelve los límites [inicio, fin) de cada rama relativos
+# al segmento. Las instancias con rama >= cant_ramas quedan al final, fuera de todas las ramas.
+def particionar(segmento: np.ndarray, ramas: np.ndarray, cant_ramas: int) -> np.ndarray:
+    ramas = np.minimum(ramas, cant_ramas)
+    # Con enteros de 8 o 16 bits el ordenamiento estable de NumPy es un radix sort: O(n)
+    tipo_ramas = np.int8 if cant_ramas < 2 ** 7 else np.int16 if cant_ramas < 2 ** 15 else np.int64
+    orden = np.argsort(ramas.astype(tipo_ramas), kind='stable')
+    segmento[:] = segmento[orden]
+
+    limites = np.zeros(cant_ramas + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ramas, minlength=cant_ramas + 1)[:cant_ramas], out=limites[1:])
+    return limites
@@ -0,0 +1,89 @@
+import math
+
+from mi_arbol_decision.nodo import Nodo
+
+# Factor de confianza por defecto de C4.5: cuanto menor es, más pesimista es la estimación del error y más se poda
+FACTOR_CONFIANZA = 0.25
+
+# Tabla de C4.5 para interpolar el desvío de la distribución normal correspondiente al factor de confianza
+_CONFIANZAS = [0, 0.001, 0.005, 0.01, 0.05, 0.10, 0.20, 0.40, 1.00]
+_DESVIOS = [4.0, 3.09, 2.58, 2.33, 1.65, 1.28, 0.84, 0.25, 0.00]
+
+
+def _coeficiente(factor_confianza: float) -> float:
+    posicion = 1
+    while factor_confianza > _CONFIANZAS[posicion]:
+        posicion += 1
+    desvio = _DESVIOS[posicion - 1] + (_DESVIOS[posicion] - _DESVIOS[posicion - 1]) * \
+        (factor_confianza - _CONFIANZAS[posicion - 1]) / (_CONFIANZAS[posicion] - _CONFIANZAS[posicion - 1])
+    return desvio * desvio
+
+
+# Errores adicionales que C4.5 le suma a una hoja con 'cant_instancias' instancias y 'errores' instancias mal
+# clasificadas: el límite superior del intervalo de confianza de la tasa de error, por la cantidad de instancias,
+# menos los errores observados. Sigue los mismos casos que la implementación original de C4.5.
+def errores_adicionales(cant_instancias: float, errores: float, factor_confianza: float = FACTOR_CONFIANZA) -> float:
+    if errores < 1e-6:
+        return cant_instancias * (1 - math.exp(math.log(factor_confianza) / cant_instancias))
+    if errores < 0.9999:
+        sin_errores = cant_instancias * (1 - math.exp(math.log(factor_confianza) / cant_instancias))
+        return sin_errores + errores * (errores_adicionales(cant_instancias, 1.0, factor_confianza) - sin_errores)
+    if errores + 0.5 >= cant_instancias:
+        return 0.67 * (cant_instancias - errores)
+
+    coeficiente = _coeficiente(factor_confianza)
+    proporcion = (errores + 0.5 + coeficiente / 2
+                  + math.sqrt(coeficiente * ((errores + 0.5) * (1 - (errores + 0.5) / cant_instancias)
+                                             + coeficiente / 4))) / (cant_instancias + coeficiente)
+    return cant_instancias * proporcion - errores
+
+
+# Poda de C4.5 por error pesimista (reemplazo de subárboles). Recorre el árbol de las hojas hacia la raíz usando el
+# conteo de clases que cada nodo guardó durante el entrenamiento: un nodo de decisión se reemplaza por una hoja con
+# su clase más común si el error estimado de esa hoja no supera al de su subárbol (ya podado) más 0.1.
+# Devuelve un árbol nuevo; el árbol recibido no se modifica.
+def podar_arbol(raiz_arbol: Nodo, factor_confianza: float = FACTOR_CONFIANZA) -> Nodo:
+    raiz_podada, _ = _podar_nodo(raiz_arbol, factor_confianza)
+    return raiz_podada
+
+
+# Devuelve el nodo podado y su error estimado
+def _podar_nodo(nodo: Nodo, factor_confianza: float) -> tuple[Nodo, float]:
+    cant_instancias = float(nodo.conteo_clases.sum())
+    errores = cant_instancias - float(nodo.conteo_clases.max())
+    errores_hoja = errores + errores_adicionales(cant_instancias, errores, factor_confianza)
+    if nodo.es_nodo_hoja():
+        return nodo, errores_hoja
+
+    nodos_hijos: dict[str, Nodo] = {}
+    errores_subarbol = 0.0
+    for condicion, nodo_hijo in nodo.nodos_hijos.items():
+        nodos_hijos[condicion], errores_hijo = _podar_nodo(nodo_hijo, factor_confianza)
+        errores_subarbol += errores_hijo
+
+    if errores_hoja <= errores_subarbol + 0.1:
+        return Nodo(valor=nodo.clase_mas_comun, clase_mas_comun=nodo.clase_mas_comun,
+                    conteo_clases=nodo.conteo_clases), errores_hoja
+    return Nodo(atributo=nodo.atributo, nodos_hijos=nodos_hijos, clase_mas_comun=nodo.clase_mas_comun,
+                umbral=nodo.umbral, conteo_clases=nodo.conteo_clases, ganancia=nodo.ganancia), errores_subarbol
+
+
+def contar_nodos(raiz_arbol: Nodo) -> int:
+    cant_nodos = 0
+    nodos_pendientes = [raiz_arbol]
+    while nodos_pendientes:
+        nodo = nodos_pendientes.pop()
+        cant_nodos += 1
+        nodos_pendientes.extend(nodo.nodos_hijos.values())
+    return cant_nodos
+
+
+# Profundidad del árbol: cantidad de niveles debajo de la raíz (0 si la raíz es una hoja)
+def calcular_profundidad(raiz_arbol: Nodo) -> int:
+    profundidad_maxima = 0
+    nodos_pendientes = [(raiz_arbol, 0)]
+    while nodos_pendientes:
+        nodo, profundidad = nodos_pendientes.pop()
+        profundidad_maxima = max(profundidad_maxima, profundidad)
+        nodos_pendientes.extend((nodo_hijo, profundidad + 1) for nodo_hijo in nodo.nodos_hijos.values())
+    return profundidad_maxima
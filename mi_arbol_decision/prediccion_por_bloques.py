@@ -0,0 +1,135 @@
+import queue
+import threading
+from collections.abc import Generator
+
+import pandas as pd
+from pandas import DataFrame
+
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+
+
+# Predice la clase de todas las filas de un archivo CSV o Parquet sin cargarlo completo en memoria.
+# El archivo se lee en bloques de 'tamano_bloque' filas, cada bloque se predice de forma vectorizada y
+# las predicciones se escriben en 'ruta_salida' (CSV o Parquet, según la extensión) a medida que se
+# obtienen, por lo que la memoria usada depende del tamaño del bloque y no del tamaño del archivo.
+# Con precargar=True un hilo lee el bloque siguiente mientras se predice el actual.
+# Las columnas de 'columnas_extra' (por ejemplo, un identificador) se copian a la salida.
+# Devuelve la cantidad de filas predichas.
+def predecir_archivo(arbol: ArbolDecision, ruta_entrada: str, ruta_salida: str, tamano_bloque: int = 100_000,
+                     precargar: bool = False, columnas_extra: list[str] | None = None,
+                     nombre_columna_prediccion: str = 'prediccion') -> int:
+    if arbol.arbol_compilado is None:
+        raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder predecir.")
+
+    columnas_extra = columnas_extra or []
+    columnas = list(dict.fromkeys(arbol.codificacion.atributos + columnas_extra))
+    bloques = _leer_bloques(ruta_entrada, columnas, tamano_bloque)
+    if precargar:
+        bloques = _precargar_bloques(bloques)
+
+    escritor = _EscritorBloques(ruta_salida)
+    cant_filas = 0
+    try:
+        for bloque in bloques:
+            salida = bloque[columnas_extra].reset_index(drop=True)
+            salida[nombre_columna_prediccion] = arbol.predecir_lote(bloque)
+            escritor.escribir(salida)
+            cant_filas += len(bloque)
+    finally:
+        bloques.close()
+        escritor.cerrar()
+
+    return cant_filas
+
+
+def _es_parquet(ruta: str) -> bool:
+    return ruta.lower().endswith(('.parquet', '.pq'))
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Para leer o escribir archivos Parquet es necesario instalar 'pyarrow'.") from error
+    return pyarrow
+
+
+def _leer_bloques(ruta: str, columnas: list[str], tamano_bloque: int) -> Generator[DataFrame, None, None]:
+    if _es_parquet(ruta):
+        pyarrow = _importar_pyarrow()
+        archivo = pyarrow.parquet.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=columnas):
+            yield lote.to_pandas()
+    else:
+        with pd.read_csv(ruta, usecols=columnas, chunksize=tamano_bloque) as lector:
+            yield from lector
+
+
+# Lee los bloques en un hilo aparte. La cola tiene lugar para un solo bloque, de modo que como máximo
+# hay un bloque leído por adelantado además del que se está prediciendo.
+# Si se deja de consumir antes del final (por una excepción o un break), el hilo lector se detiene,
+# cierra el iterador de origen (y con él el archivo) y termina antes de que se devuelva el control.
+def _precargar_bloques(bloques: Generator[DataFrame, None, None]) -> Generator[DataFrame, None, None]:
+    cola: queue.Queue = queue.Queue(maxsize=1)
+    detener = threading.Event()
+    fin = object()
+
+    # Espera lugar en la cola revisando cada tanto si se pidió detener la lectura
+    def encolar(elemento) -> bool:
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def leer():
+        try:
+            for bloque in bloques:
+                if not encolar(bloque):
+                    return
+        except BaseException as error:
+            encolar(error)
+        finally:
+            bloques.close()
+            encolar(fin)
+
+    lector = threading.Thread(target=leer, daemon=True)
+    lector.start()
+    try:
+        while True:
+            elemento = cola.get()
+            if elemento is fin:
+                return
+            if isinstance(elemento, BaseException):
+                raise elemento
+            yield elemento
+    finally:
+        detener.set()
+        lector.join()
+
+
+class _EscritorBloques:
+    def __init__(self, ruta: str):
+        self.ruta: str = ruta
+        self._escritor_parquet = None
+        self._hay_encabezado: bool = False
+
+    def escribir(self, bloque: DataFrame) -> None:
+        if _es_parquet(self.ruta):
+            pyarrow = _importar_pyarrow()
+            tabla = pyarrow.Table.from_pandas(bloque, preserve_index=False)
+            if self._escritor_parquet is None:
+                self._escritor_parquet = pyarrow.parquet.ParquetWriter(self.ruta, tabla.schema)
+            self._escritor_parquet.write_table(tabla)
+        else:
+            bloque.to_csv(self.ruta, mode='a' if self._hay_encabezado else 'w', header=not self._hay_encabezado,
+                          index=False)
+            self._hay_encabezado = True
+
+    def cerrar(self) -> None:
+        if self._escritor_parquet is not None:
+            self._escritor_parquet.close()
+            self._escritor_parquet = None
@@ -4,6 +4,7 @@ import pandas as pd
 # from mi_arbol_decision.algoritmo2 import ArbolDecision, Nodo
 from mi_arbol_decision.algoritmo3 import ArbolDecision, Nodo
 from mi_arbol_decision.funcion_impureza.funcion import FUNCIONES_IMPUREZA
+from mi_arbol_decision.traza import NIVELES_TRAZA
 
 # def imprimir_arbol(nodo, indent=""):
 #     if nodo.es_nodo_hoja():
@@ -83,7 +84,8 @@ print("----- DATAFRAME ORIGINAL -----")
 print(pd_dataframe)
 print("\n\n")
 
-arbol_decision = ArbolDecision(funcion_impureza=FUNCIONES_IMPUREZA.tasa_ganancia_informacion)
+arbol_decision = ArbolDecision(funcion_impureza=FUNCIONES_IMPUREZA.tasa_ganancia_informacion,
+                               verbosidad=NIVELES_TRAZA.detallado)
 arbol_decision.entrenar(pd_dataframe, nombre_objetivo)
 
 print("\n\n")
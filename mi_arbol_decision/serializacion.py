@@ -0,0 +1,103 @@
+import json
+import struct
+
+import numpy as np
+
+from compartido.valores_faltantes import VALORES_FALTANTES
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+from mi_arbol_decision.compilado import ArbolCompilado
+from mi_arbol_decision.datos import Codificacion
+
+# Formato binario de un árbol compilado (versión 1):
+#   - 8 bytes con la firma del formato, seguidos de la versión y el largo del encabezado (uint32 little endian)
+#   - encabezado JSON: parámetros del árbol, atributos, categorías, clases y la ubicación de cada arreglo
+#   - los arreglos del árbol compilado, cada uno alineado a ALINEACION bytes para poder mapearlos en memoria
+# El archivo no incluye los datos de entrenamiento.
+FIRMA = b'ARBOLDEC'
+VERSION = 1
+ALINEACION = 64
+_FORMATO_PREAMBULO = '<8sII'
+_ARREGLOS = ('atributo', 'umbral', 'inicio_hijos', 'hijos', 'clase', 'clase_mas_comun', 'conteo_clases')
+
+
+def _alinear(posicion: int) -> int:
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+def guardar_arbol(arbol: ArbolDecision, ruta: str) -> None:
+    if arbol.arbol_compilado is None:
+        raise RuntimeError("El árbol de decisión debe ser entrenado antes de poder guardarlo.")
+    compilado = arbol.arbol_compilado
+    codificacion = compilado.codificacion
+
+    arreglos = {nombre: np.ascontiguousarray(getattr(compilado, nombre)) for nombre in _ARREGLOS}
+    ubicaciones: dict[str, dict] = {}
+    desplazamiento = 0
+    for nombre, arreglo in arreglos.items():
+        ubicaciones[nombre] = {'tipo': arreglo.dtype.str, 'forma': list(arreglo.shape),
+                               'desplazamiento': desplazamiento}
+        desplazamiento = _alinear(desplazamiento + arreglo.nbytes)
+
+    encabezado = json.dumps({
+        'nombre_objetivo': arbol.nombre_objetivo,
+        'umbral_ganancia': arbol.umbral_ganancia,
+        'funcion_impureza': arbol.nombre_funcion_impureza,
+        'valores_faltantes': arbol.valores_faltantes,
+        'atributos': codificacion.atributos,
+        'categorias': {nombre: categorias.tolist() for nombre, categorias in codificacion.categorias.items()},
+        'etiquetas_clases': codificacion.etiquetas_clases.tolist(),
+        'arreglos': ubicaciones,
+    }).encode('utf-8')
+
+    # Los desplazamientos de los arreglos son relativos al inicio de la sección de datos
+    inicio_datos = _alinear(struct.calcsize(_FORMATO_PREAMBULO) + len(encabezado))
+    with open(ruta, 'wb') as archivo:
+        archivo.write(struct.pack(_FORMATO_PREAMBULO, FIRMA, VERSION, len(encabezado)))
+        archivo.write(encabezado)
+        for nombre, arreglo in arreglos.items():
+            archivo.seek(inicio_datos + ubicaciones[nombre]['desplazamiento'])
+            archivo.write(arreglo.tobytes())
+
+
+# Carga un árbol guardado con guardar_arbol. Con mapear_memoria=True los arreglos se abren con np.memmap en
+# modo solo lectura: cargar el modelo no depende del tamaño del árbol y los procesos que usan el mismo archivo
+# comparten las páginas en memoria. El árbol cargado solo tiene la versión compilada (raiz_arbol es None).
+def cargar_arbol(ruta: str, mapear_memoria: bool = True) -> ArbolDecision:
+    with open(ruta, 'rb') as archivo:
+        preambulo = archivo.read(struct.calcsize(_FORMATO_PREAMBULO))
+        if len(preambulo) < struct.calcsize(_FORMATO_PREAMBULO):
+            raise RuntimeError("El archivo '" + ruta + "' no contiene un árbol de decisión.")
+        firma, version, largo_encabezado = struct.unpack(_FORMATO_PREAMBULO, preambulo)
+        if firma != FIRMA:
+            raise RuntimeError("El archivo '" + ruta + "' no contiene un árbol de decisión.")
+        if version != VERSION:
+            raise RuntimeError("Versión de formato no soportada: " + str(version))
+        encabezado = json.loads(archivo.read(largo_encabezado).decode('utf-8'))
+    inicio_datos = _alinear(struct.calcsize(_FORMATO_PREAMBULO) + largo_encabezado)
+
+    arreglos: dict[str, np.ndarray] = {}
+    for nombre in _ARREGLOS:
+        ubicacion = encabezado['arreglos'][nombre]
+        tipo, forma = np.dtype(ubicacion['tipo']), tuple(ubicacion['forma'])
+        desplazamiento = inicio_datos + ubicacion['desplazamiento']
+        if mapear_memoria and int(np.prod(forma)) > 0:
+            arreglos[nombre] = np.memmap(ruta, dtype=tipo, mode='r', offset=desplazamiento, shape=forma)
+        else:
+            arreglos[nombre] = np.fromfile(ruta, dtype=tipo, count=int(np.prod(forma)),
+                                           offset=desplazamiento).reshape(forma)
+
+    codificacion = Codificacion(
+        encabezado['atributos'],
+        {nombre: np.asarray(categorias) for nombre, categorias in encabezado['categorias'].items()},
+        np.asarray(encabezado['etiquetas_clases']))
+
+    # Los archivos guardados antes de que existiera 'valores_faltantes' descartan los valores faltantes
+    arbol = ArbolDecision(umbral_ganancia=encabezado['umbral_ganancia'],
+                          funcion_impureza=encabezado['funcion_impureza'],
+                          valores_faltantes=encabezado.get('valores_faltantes', VALORES_FALTANTES.descartar))
+    arbol.nombre_objetivo = encabezado['nombre_objetivo']
+    arbol.codificacion = codificacion
+    arbol.arbol_compilado = ArbolCompilado(
+        codificacion=codificacion, fraccionar_faltantes=arbol.valores_faltantes == VALORES_FALTANTES.fraccionar,
+        **arreglos)
+    return arbol
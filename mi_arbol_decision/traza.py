@@ -0,0 +1,58 @@
+class NIVELES_TRAZA:
+    # No se registra ni se imprime nada durante el entrenamiento
+    silencioso = 0
+    # Se registran las decisiones de cada nodo como eventos estructurados
+    eventos = 1
+    # Además de registrar los eventos, se imprime en consola el detalle de cada nodo
+    detallado = 2
+
+
+class EventoNodo:
+    def __init__(self, tipo: str, profundidad: int, cant_instancias: int, atributo: str | None = None,
+                 ganancia: float | None = None, umbral: float | None = None, clase=None, motivo: str | None = None):
+        # 'division' si el nodo se expande, 'hoja' si se crea un nodo hoja
+        self.tipo: str = tipo
+        self.profundidad: int = profundidad
+        # Cantidad de instancias del subconjunto que llega al nodo
+        self.cant_instancias: int = cant_instancias
+        # Atributo elegido para dividir, su ganancia y su umbral (solo para atributos continuos)
+        self.atributo: str | None = atributo
+        self.ganancia: float | None = ganancia
+        self.umbral: float | None = umbral
+        # Clase asignada al nodo hoja y motivo por el que se dejó de expandir la rama
+        self.clase = clase
+        self.motivo: str | None = motivo
+
+    def __repr__(self):
+        campos = ', '.join(f"{nombre}={valor!r}" for nombre, valor in vars(self).items() if valor is not None)
+        return f"EventoNodo({campos})"
+
+
+class MOTIVOS_HOJA:
+    una_sola_clase = 'una_sola_clase'
+    sin_atributos = 'sin_atributos'
+    ganancia_insuficiente = 'ganancia_insuficiente'
+
+
+class Traza:
+    def __init__(self, nivel: int = NIVELES_TRAZA.silencioso):
+        self.nivel: int = nivel
+        self.eventos: list[EventoNodo] = []
+
+    @property
+    def registra_eventos(self) -> bool:
+        return self.nivel >= NIVELES_TRAZA.eventos
+
+    @property
+    def es_detallada(self) -> bool:
+        return self.nivel >= NIVELES_TRAZA.detallado
+
+    def registrar(self, tipo: str, profundidad: int, cant_instancias: int, **campos) -> None:
+        if self.registra_eventos:
+            self.eventos.append(EventoNodo(tipo, profundidad, cant_instancias, **campos))
+
+    # Imprime los objetos recibidos solo en modo detallado. Los DataFrames y Series se pasan sin
+    # formatear para que su representación en texto no se calcule cuando la traza está desactivada.
+    def imprimir(self, *objetos) -> None:
+        if self.es_detallada:
+            print(*objetos)
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pandas import DataFrame
+
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+from mi_arbol_decision.datos import (Codificacion, DatosCodificados, abrir_datos_codificados, codificar_dataframe,
+                                     guardar_datos_codificados)
+
+# Datos codificados y pliegue de cada fila en cada proceso de la validación (los asigna _inicializar_proceso)
+_datos_proceso: DatosCodificados | None = None
+_pliegues_proceso: np.ndarray | None = None
+
+
+class MODELOS:
+    # mi_arbol_decision/algoritmo3.py
+    arbol_decision = 'arbol_decision'
+    # C4.5 binario sobre matrices de NumPy (arbol_decision/algoritmo.py)
+    c45 = 'c45'
+
+
+class ResultadoPliegue:
+    def __init__(self, pliegue: int, exactitud: float, matriz_confusion: np.ndarray, tiempo_entrenamiento: float):
+        self.pliegue: int = pliegue
+        # Proporción de filas de prueba bien clasificadas
+        self.exactitud: float = exactitud
+        # Matriz (clases x clases): fila = clase real, columna = clase predicha, en el orden de etiquetas_clases
+        self.matriz_confusion: np.ndarray = matriz_confusion
+        self.tiempo_entrenamiento: float = tiempo_entrenamiento
+
+    def __repr__(self):
+        return f"ResultadoPliegue(pliegue={self.pliegue}, exactitud={self.exactitud:.4f})"
+
+
+class ResultadoValidacion:
+    def __init__(self, pliegues: list[ResultadoPliegue], etiquetas_clases: np.ndarray):
+        self.pliegues: list[ResultadoPliegue] = pliegues
+        self.etiquetas_clases: np.ndarray = etiquetas_clases
+
+    @property
+    def exactitud_media(self) -> float:
+        return float(np.mean([pliegue.exactitud for pliegue in self.pliegues]))
+
+    @property
+    def exactitud_desvio(self) -> float:
+        return float(np.std([pliegue.exactitud for pliegue in self.pliegues]))
+
+    # Suma de las matrices de confusión de todos los pliegues (cada fila se prueba en exactamente un pliegue)
+    @property
+    def matriz_confusion(self) -> np.ndarray:
+        return np.sum([pliegue.matriz_confusion for pliegue in self.pliegues], axis=0)
+
+    def __str__(self):
+        lineas = [f"Pliegue {pliegue.pliegue}: exactitud={pliegue.exactitud:.4f} "
+                  f"({pliegue.tiempo_entrenamiento:.2f} s)" for pliegue in self.pliegues]
+        lineas.append(f"Exactitud: {self.exactitud_media:.4f} ± {self.exactitud_desvio:.4f}")
+        lineas.append(f"Matriz de confusión (clases {self.etiquetas_clases.tolist()}):")
+        lineas.append(str(self.matriz_confusion))
+        return "\n".join(lineas)
+
+
+# Validación cruzada estratificada de k pliegues para ArbolDecision (MODELOS.arbol_decision) o el C4.5 binario de
+# arbol_decision (MODELOS.c45). 'parametros' se pasan al constructor del modelo.
+# El DataFrame se codifica una única vez: el conjunto de entrenamiento y el de prueba de cada pliegue son arreglos
+# de índices sobre los datos codificados, sin copiar el DataFrame. Con n_jobs > 1 los pliegues se entrenan en
+# procesos aparte que abren los datos codificados con np.memmap (ver guardar_datos_codificados).
+def validacion_cruzada(df: DataFrame, nombre_objetivo: str, modelo: str = MODELOS.arbol_decision,
+                       parametros: dict | None = None, k: int = 10, n_jobs: int = 1,
+                       semilla: int | None = 0) -> ResultadoValidacion:
+    if modelo not in (MODELOS.arbol_decision, MODELOS.c45):
+        raise RuntimeError("Modelo desconocido: " + str(modelo))
+    if k < 2:
+        raise RuntimeError("La validación cruzada necesita al menos 2 pliegues.")
+
+    datos = codificar_dataframe(df, nombre_objetivo)
+    pliegues = asignar_pliegues(datos.clases, k, semilla)
+    parametros = parametros or {}
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+
+    if n_jobs == 1:
+        matriz = _matriz_c45(datos) if modelo == MODELOS.c45 else None
+        resultados = [_evaluar_pliegue(datos, matriz, pliegues, pliegue, nombre_objetivo, modelo, parametros)
+                      for pliegue in range(k)]
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            guardar_datos_codificados(datos, directorio)
+            with ProcessPoolExecutor(max_workers=min(n_jobs, k), initializer=_inicializar_proceso,
+                                     initargs=(directorio, datos.codificacion, pliegues)) as ejecutor:
+                resultados = list(ejecutor.map(_evaluar_pliegue_proceso, range(k), [nombre_objetivo] * k,
+                                               [modelo] * k, [parametros] * k))
+
+    return ResultadoValidacion(resultados, datos.codificacion.etiquetas_clases)
+
+
+# Asigna a cada fila un pliegue entre 0 y k-1 de modo que cada clase quede repartida en partes iguales
+def asignar_pliegues(clases: np.ndarray, k: int, semilla: int | None = 0) -> np.ndarray:
+    generador = np.random.default_rng(semilla)
+    pliegues = np.empty(len(clases), dtype=np.int64)
+    for clase in np.unique(clases):
+        filas = generador.permutation(np.flatnonzero(clases == clase))
+        pliegues[filas] = np.arange(len(filas)) % k
+    return pliegues
+
+
+# Entrena con todas las filas fuera del pliegue y evalúa sobre las filas del pliegue
+def _evaluar_pliegue(datos: DatosCodificados, matriz: np.ndarray | None, pliegues: np.ndarray, pliegue: int,
+                     nombre_objetivo: str, modelo: str, parametros: dict) -> ResultadoPliegue:
+    filas_entrenamiento = np.flatnonzero(pliegues != pliegue)
+    filas_prueba = np.flatnonzero(pliegues == pliegue)
+
+    if modelo == MODELOS.c45:
+        from arbol_decision.algoritmo import C45
+        arbol = C45(**parametros)
+        inicio = time.perf_counter()
+        arbol.fit(matriz[filas_entrenamiento], datos.clases[filas_entrenamiento])
+        tiempo = time.perf_counter() - inicio
+        predicciones = arbol.predict(matriz[filas_prueba])
+    else:
+        arbol = ArbolDecision(**parametros)
+        inicio = time.perf_counter()
+        arbol.entrenar_codificado(datos, nombre_objetivo, filas_entrenamiento)
+        tiempo = time.perf_counter() - inicio
+        # Las columnas de prueba ya están codificadas con la misma codificación que usó el árbol
+        compilado = arbol.arbol_compilado
+        columnas = {posicion: datos.columnas[nombre_atributo][filas_prueba]
+                    for posicion, nombre_atributo in enumerate(datos.codificacion.atributos)}
+        predicciones = compilado.predecir_codigos(columnas, len(filas_prueba))
+
+    reales = datos.clases[filas_prueba]
+    cant_clases = datos.cant_clases
+    matriz_confusion = np.bincount(reales * cant_clases + predicciones,
+                                   minlength=cant_clases * cant_clases).reshape(cant_clases, cant_clases)
+    return ResultadoPliegue(pliegue, float(np.mean(reales == predicciones)), matriz_confusion, tiempo)
+
+
+# Matriz de atributos que espera el C4.5 binario: los categóricos se representan con su código y NaN si faltan
+def _matriz_c45(datos: DatosCodificados) -> np.ndarray:
+    columnas = []
+    for nombre_atributo in datos.codificacion.atributos:
+        columna = datos.columnas[nombre_atributo]
+        if datos.codificacion.es_continuo(nombre_atributo):
+            columnas.append(np.asarray(columna, dtype=np.float64))
+        else:
+            columnas.append(np.where(columna >= 0, columna, np.nan))
+    return np.column_stack(columnas)
+
+
+def _evaluar_pliegue_proceso(pliegue: int, nombre_objetivo: str, modelo: str, parametros: dict) -> ResultadoPliegue:
+    matriz = _matriz_c45(_datos_proceso) if modelo == MODELOS.c45 else None
+    return _evaluar_pliegue(_datos_proceso, matriz, _pliegues_proceso, pliegue, nombre_objetivo, modelo, parametros)
+
+
+def _inicializar_proceso(directorio: str, codificacion: Codificacion, pliegues: np.ndarray) -> None:
+    global _datos_proceso, _pliegues_proceso
+    _datos_proceso = abrir_datos_codificados(directorio, codificacion)
+    _pliegues_proceso = pliegues
@@ -1,7 +1,4 @@
-import os
-import sys
 import time
-from contextlib import contextmanager
 
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -12,16 +9,6 @@ from sklearn.metrics import classification_report, confusion_matrix
 
 from mi_arbol_decision.algoritmo3 import ArbolDecision, FUNCIONES_IMPUREZA
 
-@contextmanager
-def silenciar_output():
-    original_stdout = sys.stdout
-    sys.stdout = open(os.devnull, 'w')
-    try:
-        yield
-    finally:
-        sys.stdout.close()
-        sys.stdout = original_stdout
-
 # === 1. Cargar el dataset desde un CSV local ===
 nombre_csv_dataset: str = "data_cardiovascular_risk_LIMPIO_BALANCEADO.csv"
 # nombre_csv_dataset: str = "data_cardiovascular_risk_LIMPIO_DESBALANCEADO.csv"
@@ -37,8 +24,7 @@ arbol_decision = ArbolDecision(funcion_impureza=FUNCIONES_IMPUREZA.ganancia_info
 
 print("Entrenando arbol...")
 inicio_entrenamiento = time.time()
-with silenciar_output():
-    arbol_decision.entrenar(df_entrenamiento, nombre_objetivo)
+arbol_decision.entrenar(df_entrenamiento, nombre_objetivo)
 fin_entrenamiento = time.time()
 print("Fin entrenamiento arbol.")
 
@@ -46,15 +32,8 @@ tiempo_entrenamiento = fin_entrenamiento - inicio_entrenamiento
 print(f"\n⏱️ Tiempo de entrenamiento: {tiempo_entrenamiento:.2f} segundos")
 
 # === 4. Predecir las clases del conjunto de prueba ===
-predicciones = []
-reales = []
-
-atributos = list(df_completo.drop(nombre_objetivo, axis=1).columns)
-for _, fila in df_prueba.iterrows():
-    instancia = {col: fila[col] for col in atributos}
-    prediccion = arbol_decision.predecir(instancia)
-    predicciones.append(prediccion)
-    reales.append(fila[nombre_objetivo])
+predicciones = list(arbol_decision.predecir_lote(df_prueba.drop(nombre_objetivo, axis=1)))
+reales = list(df_prueba[nombre_objetivo])
 
 # === 5. Calcular precisión general ===
 print("\n--- RESULTADOS ---")
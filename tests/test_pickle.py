@@ -0,0 +1,61 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arbol_decision.algoritmo import C45
+from mi_arbol_decision.algoritmo3 import ArbolDecision
+from mi_arbol_decision.funcion_impureza.ganancia_informacion import GananciaDeInformacion
+
+RUTA_DATASET = 'datasets/data_cardiovascular_risk_LIMPIO_DESBALANCEADO.csv'
+NOMBRE_OBJETIVO = 'TenYearCHD'
+
+
+@pytest.fixture(scope='module')
+def dataset() -> pd.DataFrame:
+    return pd.read_csv(RUTA_DATASET)
+
+
+@pytest.mark.parametrize('perfilar', [False, True])
+def test_c45_entrenado_se_puede_serializar(dataset, perfilar):
+    X = dataset.drop(columns=NOMBRE_OBJETIVO).to_numpy(dtype=float)
+    y = dataset[NOMBRE_OBJETIVO].to_numpy()
+    arbol = C45(max_depth=5, perfilar=perfilar)
+    arbol.fit(X, y)
+
+    copia = pickle.loads(pickle.dumps(arbol))
+
+    assert np.array_equal(copia.predict(X), arbol.predict(X))
+    assert copia.perfil.reporte() == arbol.perfil.reporte()
+    # El perfil recuperado sigue funcionando (con un bloqueo nuevo)
+    copia.fit(X, y)
+
+
+def test_funcion_impureza_con_hilos_se_puede_serializar():
+    funcion = GananciaDeInformacion(NOMBRE_OBJETIVO, n_jobs=2)
+    funcion._ejecutor = ThreadPoolExecutor(max_workers=2)
+    try:
+        copia = pickle.loads(pickle.dumps(funcion))
+    finally:
+        funcion.cerrar()
+
+    assert copia.n_jobs == 2
+    assert copia._ejecutor is None
+    with copia._bloqueo_ejecutor:
+        pass
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_arbol_decision_entrenado_se_puede_serializar(dataset, n_jobs):
+    arbol = ArbolDecision(umbral_ganancia=0.01, n_jobs=n_jobs, n_jobs_construccion=n_jobs, perfilar=True)
+    arbol.entrenar(dataset, NOMBRE_OBJETIVO)
+    X = dataset.drop(columns=NOMBRE_OBJETIVO)
+
+    copia = pickle.loads(pickle.dumps(arbol))
+
+    assert np.array_equal(copia.predecir_lote(X), arbol.predecir_lote(X))
+    # El modelo recuperado se puede volver a entrenar
+    copia.entrenar(dataset, NOMBRE_OBJETIVO)
+    assert copia.estadisticas_cache == arbol.estadisticas_cache